@@ -0,0 +1 @@
+"""Benchmark suite of the scoring pipeline"""
@@ -0,0 +1,202 @@
+"""
+Benchmark of the scoring pipeline stages on synthetic cohorts.
+
+Each stage (ingestion, strategy application, encoding, prediction,
+complexity, filtering, export and figures building) is timed on cohorts of
+increasing sizes, its peak traced memory is measured in a second run, and
+the results are saved as JSON so that runs can be compared over time:
+
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 \\
+        --output bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from services.baseline_grader_model import BaselineGraderModel
+from services.data_ingestion import load_student_data
+from services.default_improvement_strategy import (DefaultImprovementStrategy,
+                                                   compute_improvement_levels)
+from services.export import serialize_frame
+from services.model_registry import get_model_registry
+from services.range_index import MeasureRangeIndex
+from services.utils import get_metadata
+from .synthetic_cohort import generate_cohort
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DISPLAY_COLUMNS = [
+    "FirstName", "FamilyName", "PerformanceGain", "Complexity", "FinalGrade",
+    "ExpectedGrade"
+]
+
+
+def measure(stage_function, trace_memory=True):
+    """Wall time of `stage_function` and its peak traced memory"""
+    start = time.perf_counter()
+    result = stage_function()
+    seconds = time.perf_counter() - start
+    peak_bytes = None
+    if trace_memory:
+        tracemalloc.start()
+        stage_function()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak_bytes
+
+
+def get_stages(cohort_path, cache_dir):
+    """Ordered (name, function) benchmark stages, each using the state
+    produced by the previous ones"""
+    state = dict()
+
+    def ingest_csv():
+        state["data"] = load_student_data(cohort_path, cache_dir=cache_dir)
+
+    def ingest_cache():
+        state["data"] = load_student_data(cohort_path, cache_dir=cache_dir)
+
+    def strategy():
+        data = state["data"]
+        X = data.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+        estimator = DefaultImprovementStrategy(X, data["FinalGrade"])
+        estimator.apply_improvement_strategy()
+        name_columns = ["FirstName", "FamilyName", "FinalGrade"]
+        estimator.X_target[name_columns] = data[name_columns]
+        state["estimator"] = estimator
+
+    def encode():
+        estimator = state["estimator"]
+        # a fresh model so that no encoded block is reused
+        BaselineGraderModel(estimator.X).build_design_matrix(
+            estimator.X_target)
+
+    def predict():
+        estimator = state["estimator"]
+        BaselineGraderModel(estimator.X).predict(estimator.X_target)
+
+    def complexity():
+        estimator = state["estimator"]
+        np.sum(list(
+            compute_improvement_levels(estimator.X, estimator.strategy_config,
+                                       get_metadata()).values()),
+               axis=0)
+
+    def filter_students():
+        display_frame = state["estimator"].X_target[DISPLAY_COLUMNS]
+        range_index = MeasureRangeIndex(display_frame,
+                                        ["PerformanceGain", "Complexity"])
+        range_index.query({
+            "PerformanceGain": (0, 20),
+            "Complexity": (0, 10)
+        },
+                          sort_by="PerformanceGain",
+                          ascending=False)
+
+    def export_csv():
+        serialize_frame(state["estimator"].X_target[DISPLAY_COLUMNS], "csv")
+
+    def export_csv_gz():
+        serialize_frame(state["estimator"].X_target[DISPLAY_COLUMNS],
+                        "csv.gz")
+
+    def figures():
+        # plotting dependencies are only imported by this stage
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from services.utils_plotting import (priority_scatter_plot,
+                                             scatter_plot)
+        estimator = state["estimator"]
+        for option in ("static", "interactive"):
+            figures = [
+                scatter_plot(estimator.X_target["PerformanceGain"],
+                             estimator.X_target["Complexity"],
+                             option,
+                             color="orange"),
+                priority_scatter_plot(estimator, estimator.y, option)
+            ]
+            if option == "interactive":
+                for figure in figures:
+                    figure.to_json()
+        plt.close("all")
+
+    return [("ingest_csv", ingest_csv), ("ingest_cache", ingest_cache),
+            ("strategy", strategy), ("encode", encode), ("predict", predict),
+            ("complexity", complexity), ("filter", filter_students),
+            ("export_csv", export_csv), ("export_csv_gz", export_csv_gz),
+            ("figures", figures)]
+
+
+def run_benchmarks(sizes, trace_memory=True, skip_stages=()):
+    """Benchmark every stage at each of the cohort `sizes`"""
+    # model loading is not part of the measured stages
+    get_model_registry().warm_up(["grader-model-v1", "grader-encoder-v1"])
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cohort_path = os.path.join(tmp_dir, "cohort.csv")
+            generate_cohort(size).to_csv(cohort_path)
+            cache_dir = os.path.join(tmp_dir, "cache")
+            for stage, stage_function in get_stages(cohort_path, cache_dir):
+                if stage in skip_stages:
+                    continue
+                if stage == "ingest_csv":
+                    # the cache is rebuilt by both measured runs
+                    def stage_function(function=stage_function):
+                        os.utime(cohort_path)
+                        function()
+                _, seconds, peak_bytes = measure(stage_function,
+                                                 trace_memory)
+                results.append({
+                    "size": size,
+                    "stage": stage,
+                    "seconds": seconds,
+                    "peak_bytes": peak_bytes
+                })
+                print(f"{size:>9} {stage:<14} {seconds:9.4f}s")
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run_benchmarks",
+        description="Benchmark the scoring pipeline on synthetic cohorts")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--no-memory",
+                        action="store_true",
+                        help="skip the traced peak memory runs")
+    parser.add_argument("--skip",
+                        nargs="*",
+                        default=[],
+                        help="stages to skip, e.g. figures")
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.sizes,
+                             trace_memory=not args.no_memory,
+                             skip_stages=set(args.skip))
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "versions": {
+                    "numpy": np.__version__,
+                    "pandas": pd.__version__
+                },
+                "results": results
+            },
+            file,
+            indent=2)
+
+
+if __name__ == "__main__":
+    main()
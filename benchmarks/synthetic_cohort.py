@@ -0,0 +1,30 @@
+"""
+Synthetic students cohort generator.
+
+Each column is sampled independently from the values observed in the
+reference `data/student_data.csv`, so that the generated cohorts follow the
+students data schema and the `get_metadata()` value domains at any size.
+"""
+
+import numpy as np
+import pandas as pd
+from services.data_ingestion import INDEX_COLUMN
+
+REFERENCE_DATA_PATH = "data/student_data.csv"
+
+
+def generate_cohort(n_students,
+                    reference_path=REFERENCE_DATA_PATH,
+                    random_state=0):
+    """Synthetic cohort of `n_students` indexed by StudentID"""
+    reference = pd.read_csv(reference_path, index_col=INDEX_COLUMN)
+    rng = np.random.default_rng(random_state)
+    columns = dict()
+    for column in reference.columns:
+        values, counts = np.unique(reference[column].to_numpy(),
+                                   return_counts=True)
+        columns[column] = rng.choice(values,
+                                     size=n_students,
+                                     p=counts / counts.sum())
+    return pd.DataFrame(columns,
+                        index=pd.RangeIndex(n_students, name=INDEX_COLUMN))
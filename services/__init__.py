@@ -1,9 +1,81 @@
-from .utils_plotting import scatter_plot, priority_scatter_plot
+from importlib import import_module
 from .default_improvement_strategy import DefaultImprovementStrategy
-from .utils import adjust_page_ui_settings, add_title, get_all_actionable_features, filter_and_export_component
+from .model_registry import ModelRegistry, get_model_registry
+from .utils import get_all_actionable_features
+
+# Only the scoring core (numpy/pandas/sklearn/joblib) is imported eagerly.
+# The other helpers, and especially the plotting and view ones that pull in
+# matplotlib/plotly/streamlit, are imported on first attribute access.
+_lazy_attributes = {
+    "BaselineGraderModel": ".baseline_grader_model",
+    "BatchImprovementStrategy": ".batch_improvement_strategy",
+    "OptimalImprovementStrategy": ".optimal_improvement_strategy",
+    "IncrementalImprovementStrategy": ".incremental_scoring",
+    "IncrementalResultStore": ".incremental_scoring",
+    "StrategyResult": ".strategy_result",
+    "load_student_data": ".data_ingestion",
+    "validate_student_data": ".data_ingestion",
+    "get_shared_cohort_store": ".shared_cohort",
+    "StrategyResultCache": ".result_cache",
+    "make_cache_key": ".result_cache",
+    "file_fingerprint": ".result_cache",
+    "artifacts_version": ".result_cache",
+    "frame_fingerprint": ".result_cache",
+    "MeasureRangeIndex": ".range_index",
+    "PrioritizationIndex": ".prioritization",
+    "StrategyCube": ".strategy_cube",
+    "DEFAULT_CUBE_PATH": ".strategy_cube",
+    "get_source_fingerprint": ".data_ingestion",
+    "ShardedStrategyScorer": ".parallel_scoring",
+    "DebouncedRunner": ".background",
+    "ScoringServiceClient": ".scoring_service",
+    "start_local_server": ".scoring_service",
+    "span": ".instrumentation",
+    "timed": ".instrumentation",
+    "enable_timing": ".instrumentation",
+    "timing_enabled": ".instrumentation",
+    "start_run": ".instrumentation",
+    "get_run_records": ".instrumentation",
+    "scatter_plot": ".utils_plotting",
+    "priority_scatter_plot": ".utils_plotting",
+    "adjust_page_ui_settings": ".utils_view",
+    "add_title": ".utils_view",
+    "filter_and_export_component": ".utils_view",
+    "export_component": ".utils_view",
+    "prioritization_component": ".utils_view",
+    "strategy_cube_component": ".utils_view"
+}
 
 __all__ = [
+    "BaselineGraderModel",
     "scatter_plot", "priority_scatter_plot", "adjust_page_ui_settings",
-    "DefaultImprovementStrategy", "get_all_actionable_features",
-    "adjust_page_ui_settings", "add_title", "filter_and_export_component"
+    "DefaultImprovementStrategy", "BatchImprovementStrategy",
+    "OptimalImprovementStrategy", "IncrementalImprovementStrategy",
+    "IncrementalResultStore", "StrategyResult",
+    "get_all_actionable_features",
+    "adjust_page_ui_settings", "add_title", "filter_and_export_component",
+    "export_component", "prioritization_component",
+    "strategy_cube_component",
+    "ModelRegistry", "get_model_registry", "StrategyResultCache",
+    "make_cache_key", "file_fingerprint", "artifacts_version",
+    "frame_fingerprint",
+    "load_student_data", "validate_student_data", "get_shared_cohort_store",
+    "get_source_fingerprint", "MeasureRangeIndex", "PrioritizationIndex",
+    "StrategyCube", "DEFAULT_CUBE_PATH", "ShardedStrategyScorer",
+    "DebouncedRunner", "ScoringServiceClient", "start_local_server",
+    "span", "timed", "enable_timing", "timing_enabled", "start_run",
+    "get_run_records"
 ]
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(import_module(_lazy_attributes[name], __name__), name)
+        # cache the attribute so that later accesses skip `__getattr__`
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
@@ -0,0 +1,127 @@
+"""
+Debounced background computations.
+
+Dragging a dashboard slider requests a new strategy evaluation for every
+intermediate value. A `DebouncedRunner` (one per session) only starts a
+computation once its request has not been superseded for `debounce_seconds`,
+runs it on a worker pool shared by all the sessions and drops the results of
+superseded requests, while the view keeps showing the last completed result.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DebouncedRunner:
+    """Runs the latest of a stream of keyed computations in the background"""
+
+    def __init__(self, executor, debounce_seconds=0.3):
+        self.executor = executor
+        self.debounce_seconds = debounce_seconds
+        self.generation = 0
+        self._requested_key = None
+        self._completed = None
+        self._error = None
+        self._timer = None
+        self._future = None
+        self._condition = threading.Condition()
+
+    def submit(self, key, compute):
+        """
+        Request the computation of `key`, superseding the previous pending
+        request. Requesting the pending or the completed key is a no-op.
+        """
+        with self._condition:
+            if key == self._requested_key and self._error is None:
+                return
+            self._supersede(key)
+            if self._completed is not None and self._completed[0] == key:
+                return
+            self._timer = threading.Timer(self.debounce_seconds,
+                                          self._start,
+                                          args=(self.generation, key,
+                                                compute))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def resolve(self, key, value):
+        """Mark `key` as computed, e.g. from a cache, superseding requests"""
+        with self._condition:
+            self._supersede(key)
+            self._completed = (key, value)
+            self._condition.notify_all()
+
+    def _supersede(self, key):
+        """Make `key` the latest request, cancelling the pending one"""
+        self.generation += 1
+        self._requested_key = key
+        self._error = None
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._future is not None:
+            self._future.cancel()
+        self._timer = self._future = None
+
+    def _start(self, generation, key, compute):
+        """Submit the debounced request if it is still the latest one"""
+        with self._condition:
+            if generation != self.generation:
+                return
+            self._future = self.executor.submit(self._run, generation, key,
+                                                compute)
+
+    def _run(self, generation, key, compute):
+        """Compute `key` in a worker thread, dropping superseded results"""
+        with self._condition:
+            if generation != self.generation:
+                return
+        try:
+            value = compute()
+        except Exception as error:
+            logger.exception("background computation of %s failed", key)
+            with self._condition:
+                if generation == self.generation:
+                    self._error = error
+                    self._condition.notify_all()
+            return
+        with self._condition:
+            if generation == self.generation:
+                self._completed = (key, value)
+                self._condition.notify_all()
+            else:
+                logger.info("dropped superseded computation of %s", key)
+
+    @property
+    def completed(self):
+        """(key, value) of the last completed computation, None if none"""
+        return self._completed
+
+    @property
+    def pending(self):
+        """Whether the latest requested key is not computed yet"""
+        with self._condition:
+            return self._error is None and (
+                self._completed is None
+                or self._completed[0] != self._requested_key)
+
+    def wait(self, timeout=None):
+        """
+        Wait until the latest request is computed (or failed), up to
+        `timeout` seconds. Raises the error of a failed computation.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._error is None and (
+                    self._completed is None
+                    or self._completed[0] != self._requested_key):
+                remaining = None if deadline is None else (
+                    deadline - time.monotonic())
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._error is not None:
+                raise self._error
+            return self._completed
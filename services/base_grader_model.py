@@ -4,6 +4,8 @@ models with potential online training or only online inference.
 """
 
 from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
 
 
 class BaseGraderModel(ABC):
@@ -19,3 +21,39 @@ class BaseGraderModel(ABC):
         """
         Abstract method that conducts inference
         """
+
+    def predict_batch(self, X, strategy_configs):
+        """
+        Infere the grades of `X` under each of the `strategy_configs` with a
+        single call to `predict` on the stacked modified features, returns an
+        array of shape (n_strategies, n_students)
+        """
+        stacked = pd.concat([
+            X.assign(**strategy_config) for strategy_config in strategy_configs
+        ],
+                            ignore_index=True)
+        return np.asarray(self.predict(stacked)).reshape(
+            len(strategy_configs), len(X))
+
+    @property
+    def supports_delta_scoring(self):
+        """
+        Whether expected grades of modified features can be derived from the
+        baseline prediction in closed form (e.g. linear regressors)
+        """
+        return False
+
+    def predict_delta(self, X, X_target, features):
+        """
+        Infere the grades of `X_target`, which only differs from `X` on
+        `features`, as the baseline prediction of `X` plus the effect of the
+        modified features
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support delta scoring")
+
+    def check_delta_scoring(self, X, X_target, features, atol=1e-8):
+        """Check that delta scoring agrees with the full inference path"""
+        return np.allclose(self.predict_delta(X, X_target, features),
+                           self.predict(X_target),
+                           atol=atol)
@@ -2,9 +2,11 @@
 Baseline grading model. For version 1, this baseline model supports online inference only.
 """
 
+import numpy as np
 import pandas as pd
 from .base_grader_model import BaseGraderModel
-from .utils import load_joblib
+from .instrumentation import span
+from .model_registry import ModelRegistry, get_model_registry
 
 
 class BaselineGraderModel(BaseGraderModel):
@@ -15,19 +17,219 @@ class BaselineGraderModel(BaseGraderModel):
         "nursery", "higher", "internet", "romantic"
     ]
 
-    def __init__(self, X: pd.DataFrame, y: pd.Series = None):
+    def __init__(self,
+                 X: pd.DataFrame,
+                 y: pd.Series = None,
+                 model_name="grader-model-v1",
+                 encoder_name="grader-encoder-v1",
+                 registry: ModelRegistry = None):
         super().__init__(X, y)
-        self.model_name = "grader-model-v1"
-        self.encoder_name = "grader-encoder-v1"
-        self.regressor = load_joblib(
-            f"./assets/models/{self.model_name}.joblib")
-        self.encoder = load_joblib(
-            f"./assets/models/{self.encoder_name}.joblib")
+        self.model_name = model_name
+        self.encoder_name = encoder_name
+        # shared, read-only instances loaded once per process
+        if registry is None:
+            registry = get_model_registry()
+        self.regressor = registry.get(self.model_name)
+        self.encoder = registry.get(self.encoder_name)
+        self._encoded_features = list(self.encoder.get_feature_names_out())
+        self._numeric_features = [
+            feature for feature in getattr(self.regressor,
+                                           "feature_names_in_", X.columns)
+            if feature not in self._encoded_features
+            and feature not in self._categotical_features
+        ]
+        # infrequent categories grouping is left to the encoder itself
+        infrequent_categories = getattr(self.encoder,
+                                        "infrequent_categories_", None)
+        self._fast_encoding = infrequent_categories is None or all(
+            categories is None for categories in infrequent_categories)
+        self._design_slices = self._get_design_slices()
+        self._encoding_cache = (None, dict())
+        self._coefficients = self._get_linear_coefficients()
+        self._baseline = None
 
     def predict(self, X: pd.DataFrame):
-        """Infere grade"""
-        X.loc[:,
-              self.encoder.get_feature_names_out()] = self.encoder.transform(
-                  X[self._categotical_features]).toarray()
-        X.drop(self._categotical_features, axis=1, inplace=True)
-        return self.regressor.predict(X)
+        """Infere grade, `X` is left unmodified"""
+        with span("model.encode", rows=len(X)):
+            design = self.build_design_matrix(X)
+        with span("model.predict", rows=len(X)):
+            return self.regressor.predict(design)
+
+    def build_design_matrix(self, X: pd.DataFrame):
+        """
+        Build the regressor's design matrix in one preallocated float buffer.
+        The one-hot blocks of categorical features whose values did not
+        change since the previous call on the same students are reused.
+        """
+        if not self._fast_encoding:
+            design = X[self._numeric_features + self._categotical_features]
+            encoded = self.encoder.transform(
+                design[self._categotical_features])
+            design = design.drop(self._categotical_features, axis=1)
+            design[self._encoded_features] = encoded.toarray()
+            return design
+        n_numeric = len(self._numeric_features)
+        design = np.empty((len(X), n_numeric + len(self._encoded_features)))
+        for position, feature in enumerate(self._numeric_features):
+            design[:, position] = X[feature].to_numpy()
+        cached_index, cached_blocks = self._encoding_cache
+        if cached_index is None or not cached_index.equals(X.index):
+            cached_blocks = dict()
+        encoded_blocks = dict()
+        for feature_idx, feature in enumerate(self._categotical_features):
+            values = X[feature].to_numpy()
+            cached = cached_blocks.get(feature)
+            if cached is None or not np.array_equal(cached[0], values):
+                cached = (values, self._encode_feature(feature_idx, values))
+            encoded_blocks[feature] = cached
+            design[:, self._design_slices[feature]] = cached[1]
+        self._encoding_cache = (X.index, encoded_blocks)
+        return pd.DataFrame(design,
+                            index=X.index,
+                            columns=self._numeric_features +
+                            self._encoded_features,
+                            copy=False)
+
+    def predict_batch(self, X: pd.DataFrame, strategy_configs):
+        """
+        Infere the grades of `X` under each of the `strategy_configs`. Linear
+        regressors are scored in closed form, otherwise the baseline design
+        matrix is stacked once per strategy and the regressor called once.
+        """
+        if self.supports_delta_scoring:
+            baseline = self.predict_baseline(X)
+            current_contributions, target_contributions = dict(), dict()
+            expected_grades = np.empty((len(strategy_configs), len(X)))
+            for strategy_idx, strategy_config in enumerate(strategy_configs):
+                expected_grades[strategy_idx] = baseline
+                offset = 0.
+                for feature, target_value in strategy_config.items():
+                    if feature not in current_contributions:
+                        current_contributions[feature] = (
+                            self.feature_contributions(feature, X[feature]))
+                    target_key = (feature, target_value)
+                    if target_key not in target_contributions:
+                        target_contributions[target_key] = (
+                            self.feature_contributions(
+                                feature, pd.Series([target_value]))[0])
+                    offset += target_contributions[target_key]
+                    expected_grades[strategy_idx] -= current_contributions[
+                        feature]
+                expected_grades[strategy_idx] += offset
+            return expected_grades
+        if not self._fast_encoding:
+            return super().predict_batch(X, strategy_configs)
+        design = self.build_design_matrix(X)
+        stacked = np.tile(design.to_numpy(), (len(strategy_configs), 1))
+        for strategy_idx, strategy_config in enumerate(strategy_configs):
+            rows = slice(strategy_idx * len(X), (strategy_idx + 1) * len(X))
+            for feature, target_value in strategy_config.items():
+                if feature in self._categotical_features:
+                    target_value = self._encode_feature(
+                        self._categotical_features.index(feature),
+                        np.array([target_value], dtype=object))[0]
+                stacked[rows, self._design_slices[feature]] = target_value
+        return self.regressor.predict(
+            pd.DataFrame(stacked, columns=design.columns,
+                         copy=False)).reshape(len(strategy_configs), len(X))
+
+    def _get_design_slices(self):
+        """Columns of each model feature in the design matrix"""
+        design_slices = {
+            feature: slice(position, position + 1)
+            for position, feature in enumerate(self._numeric_features)
+        }
+        start = len(self._numeric_features)
+        drop_idx = getattr(self.encoder, "drop_idx_", None)
+        for feature_idx, feature in enumerate(self._categotical_features):
+            stop = start + len(self.encoder.categories_[feature_idx])
+            if drop_idx is not None and drop_idx[feature_idx] is not None:
+                stop -= 1
+            design_slices[feature] = slice(start, stop)
+            start = stop
+        return design_slices
+
+    def _encode_feature(self, feature_idx, values):
+        """One-hot encode a single categorical feature as a uint8 block"""
+        categories = self.encoder.categories_[feature_idx]
+        codes = pd.Categorical(values, categories=categories).codes
+        known = codes >= 0
+        if self.encoder.handle_unknown == "error" and not known.all():
+            raise ValueError(
+                f"Found unknown categories in feature "
+                f"{self._categotical_features[feature_idx]}")
+        block = np.zeros((len(values), len(categories)), dtype=np.uint8)
+        block[np.flatnonzero(known), codes[known]] = 1
+        if self.encoder.drop_idx_ is not None and self.encoder.drop_idx_[
+                feature_idx] is not None:
+            block = np.delete(block, self.encoder.drop_idx_[feature_idx],
+                              axis=1)
+        return block
+
+    @property
+    def supports_delta_scoring(self):
+        """Linear regressors support delta scoring"""
+        return self._coefficients is not None
+
+    def predict_delta(self, X: pd.DataFrame, X_target: pd.DataFrame,
+                      features):
+        """
+        Infere grades as the baseline prediction of `X` plus
+        Σ coef × (target - current) over the modified `features`
+        """
+        if not self.supports_delta_scoring:
+            return super().predict_delta(X, X_target, features)
+        expected_grades = self.predict_baseline(X).copy()
+        for feature in features:
+            expected_grades += self.feature_contributions(
+                feature, X_target[feature]) - self.feature_contributions(
+                    feature, X[feature])
+        return expected_grades
+
+    def predict_baseline(self, X: pd.DataFrame):
+        """
+        Infere (and keep) the grades of the unmodified students `X`. The
+        grades are kept for the `X` object and its index, so the values of
+        `X` must not be modified in place afterwards (the shared cohort
+        frames are read-only memory maps). Safe to call from several threads
+        sharing the model.
+        """
+        # read and replaced as a whole, never torn by a concurrent call
+        entry = self._baseline
+        if entry is None or entry[0] is not X or entry[1] is not X.index or (
+                len(entry[2]) != len(X)):
+            entry = (X, X.index, self.predict(X))
+            self._baseline = entry
+        return entry[2]
+
+    def feature_contributions(self, feature, values: pd.Series):
+        """Linear contribution of `feature` taking `values` to the grade"""
+        if feature in self._categotical_features:
+            contributions = np.zeros(len(values))
+            for category, coefficient in self._coefficients[feature].items():
+                contributions[(values == category).to_numpy()] = coefficient
+            return contributions
+        return self._coefficients[feature] * values.to_numpy(dtype=float)
+
+    def _get_linear_coefficients(self):
+        """
+        Map each model feature to its coefficient, folding the one-hot
+        coefficients back into their categorical feature. Returns None when
+        the regressor is not linear.
+        """
+        coefficients = getattr(self.regressor, "coef_", None)
+        feature_names = getattr(self.regressor, "feature_names_in_", None)
+        if coefficients is None or feature_names is None or np.ndim(
+                coefficients) != 1:
+            return None
+        design_coefficients = dict(zip(feature_names, coefficients))
+        linear_coefficients = dict(design_coefficients)
+        for feature, categories in zip(self._categotical_features,
+                                       self.encoder.categories_):
+            # dropped or unknown categories are encoded as zeros
+            linear_coefficients[feature] = {
+                category: design_coefficients.get(f"{feature}_{category}",
+                                                  0.0)
+                for category in categories
+            }
+        return linear_coefficients
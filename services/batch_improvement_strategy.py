@@ -0,0 +1,82 @@
+"""
+Batch improvement strategy: scores several strategy configurations at once.
+
+All the configurations share the baseline students data (and its encoding),
+the grading model being called once on the stacked modified features instead
+of once per strategy.
+"""
+
+import numpy as np
+import pandas as pd
+from .base_improvement_strategy import BaseImprovementStrategy
+from .default_improvement_strategy import (DefaultImprovementStrategy,
+                                           compute_improvement_levels)
+
+
+class BatchImprovementStrategy(BaseImprovementStrategy):
+    """
+    Batch of improvement strategies evaluated in one pass
+    """
+
+    def __init__(self,
+                 X: pd.DataFrame,
+                 y=None,
+                 strategy_configs=None,
+                 strategy_names=None,
+                 inference_model=None,
+                 max_batch_rows=1_000_000):
+        if strategy_configs is None:
+            strategy_configs = [
+                DefaultImprovementStrategy.default_strategy_config
+            ]
+        super().__init__(X=X,
+                         y=y,
+                         strategy_name="BatchImprovementStrategy",
+                         strategy_config=list(strategy_configs),
+                         inference_model=inference_model)
+        self.strategy_configs = self.strategy_config
+        self.strategy_names = strategy_names
+        if strategy_names is None:
+            self.strategy_names = [
+                f"strategy-{idx}" for idx in range(len(self.strategy_configs))
+            ]
+        # upper bound of the stacked rows sent to the grading model at once
+        self.max_batch_rows = max_batch_rows
+        self.results = None
+
+    def apply_improvement_strategy(self):
+        """
+        Score all the strategies. Results are set in long format with one
+        row per (strategy, student).
+        """
+        n_strategies, n_students = len(self.strategy_configs), len(self.X)
+        # plain arrays of the actionable features shared by all strategies
+        features = {
+            feature: self.X[feature].to_numpy()
+            for strategy_config in self.strategy_configs
+            for feature in strategy_config
+        }
+        complexity = np.vstack([
+            np.sum(list(
+                compute_improvement_levels(features, strategy_config,
+                                           self.metadata).values()),
+                   axis=0) for strategy_config in self.strategy_configs
+        ])
+
+        expected_grades = np.empty((n_strategies, n_students))
+        batch_size = max(1, self.max_batch_rows // max(1, n_students))
+        for start in range(0, n_strategies, batch_size):
+            stop = start + batch_size
+            expected_grades[start:stop] = self.inference_model.predict_batch(
+                self.X, self.strategy_configs[start:stop])
+        performance_gain = expected_grades - np.asarray(self.y, dtype=float)
+
+        index_name = self.X.index.name if self.X.index.name else "StudentID"
+        self.results = pd.DataFrame({
+            "Strategy": np.repeat(self.strategy_names, n_students),
+            index_name: np.tile(self.X.index.to_numpy(), n_strategies),
+            "Complexity": complexity.ravel(),
+            "ExpectedGrade": expected_grades.ravel(),
+            "PerformanceGain": performance_gain.ravel()
+        })
+        return self.results
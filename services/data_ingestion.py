@@ -0,0 +1,199 @@
+"""
+Student data ingestion.
+
+The students CSV is validated once against the `get_metadata()` schema and
+stored in a compact columnar cache next to it: categorical features as codes
+plus their categories and numeric features in the smallest integer type that
+fits. Each column is saved as a `.npy` file so that later loads only memory
+map the cache instead of parsing the CSV. The cache is rebuilt automatically
+whenever the source CSV changes.
+
+Each cache version lives in its own directory named after the source
+fingerprint, written aside and renamed into place, so that several processes
+can build and read the cache concurrently: the loser of a rename race simply
+uses the winner's (identical) version, and a version is never modified once
+published.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from .utils import get_metadata
+
+INDEX_COLUMN = "StudentID"
+NAME_COLUMNS = ["FirstName", "FamilyName"]
+CACHE_FORMAT_VERSION = 2
+
+
+def get_source_fingerprint(path):
+    """Fingerprint of the source file used to invalidate its cache"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_cache_dir(path):
+    """Default cache directory of the source file `path`"""
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, ".cache", filename)
+
+
+def get_version_dir(cache_dir, source_fingerprint):
+    """Cache directory of one version of the source file"""
+    return os.path.join(
+        cache_dir, f"v{CACHE_FORMAT_VERSION}-{source_fingerprint['size']}-"
+        f"{source_fingerprint['mtime_ns']}")
+
+
+def validate_student_data(frame: pd.DataFrame):
+    """Check that `frame` follows the students features schema"""
+    metadata = get_metadata()
+    expected_columns = set().union(*metadata.values()) | set(NAME_COLUMNS)
+    missing_columns = expected_columns - set(frame.columns)
+    if missing_columns:
+        raise ValueError(
+            f"Missing student data columns: {sorted(missing_columns)}")
+    for feature in expected_columns:
+        if frame[feature].isna().any():
+            raise ValueError(f"Missing values in column {feature}")
+    for feature in metadata["numeric"]:
+        if not pd.api.types.is_integer_dtype(frame[feature]):
+            raise ValueError(
+                f"Numeric column {feature} should only hold integers")
+    for feature in metadata["binary"]:
+        if frame[feature].nunique() > 2:
+            raise ValueError(
+                f"Binary column {feature} holds more than two values")
+
+
+def compact_student_data(frame: pd.DataFrame):
+    """
+    Compact column types: categorical dtype for the binary, nominal and
+    name columns and downcast integers for the numeric ones
+    """
+    metadata = get_metadata()
+    categorical_columns = metadata["binary"] | metadata["nominal"] | set(
+        NAME_COLUMNS)
+    compact_columns = dict()
+    for column in frame.columns:
+        if column in categorical_columns:
+            compact_columns[column] = frame[column].astype("category")
+        elif pd.api.types.is_integer_dtype(frame[column]):
+            compact_columns[column] = pd.to_numeric(frame[column],
+                                                    downcast="integer")
+        else:
+            compact_columns[column] = frame[column]
+    return pd.DataFrame(compact_columns, index=frame.index)
+
+
+def write_cache(frame: pd.DataFrame, cache_dir, source_fingerprint):
+    """
+    Write `frame` as one `.npy` file per column plus its metadata in the
+    version directory of `source_fingerprint`, returns that directory
+    """
+    version_dir = get_version_dir(cache_dir, source_fingerprint)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix="tmp")
+    try:
+        columns = []
+        for position, column in enumerate(frame.columns):
+            values = frame[column]
+            column_meta = {"name": column, "file": f"{position}.npy"}
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                column_meta["categories"] = values.cat.categories.tolist()
+                values = values.cat.codes
+            np.save(os.path.join(tmp_dir, column_meta["file"]),
+                    values.to_numpy())
+            columns.append(column_meta)
+        np.save(os.path.join(tmp_dir, "index.npy"), frame.index.to_numpy())
+        with open(os.path.join(tmp_dir, "meta.json"), "w",
+                  encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": CACHE_FORMAT_VERSION,
+                    "source": source_fingerprint,
+                    "index": frame.index.name,
+                    "columns": columns
+                }, file)
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # another process published the same version first
+            if read_cache_meta(version_dir) is None:
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return version_dir
+
+
+def prune_cache(cache_dir, keep_dir):
+    """
+    Remove the outdated versions of the cache, open memory maps of a removed
+    version stay valid
+    """
+    for entry in os.scandir(cache_dir):
+        if entry.path == keep_dir or entry.name.startswith("tmp"):
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            # files of the previous, unversioned, cache layout
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def read_cache_meta(cache_dir):
+    """Cache metadata, None when there is no readable cache"""
+    try:
+        with open(os.path.join(cache_dir, "meta.json"),
+                  encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def read_cache(cache_dir, mmap=True):
+    """Load a cached students frame, memory mapping its columns"""
+    meta = read_cache_meta(cache_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No students data cache in {cache_dir}")
+    mmap_mode = "r" if mmap else None
+    columns = dict()
+    for column_meta in meta["columns"]:
+        values = np.load(os.path.join(cache_dir, column_meta["file"]),
+                         mmap_mode=mmap_mode)
+        if "categories" in column_meta:
+            values = pd.Categorical.from_codes(values,
+                                               column_meta["categories"])
+        columns[column_meta["name"]] = values
+    index = pd.Index(np.load(os.path.join(cache_dir, "index.npy"),
+                             mmap_mode=mmap_mode),
+                     name=meta["index"])
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def load_student_data(path, cache_dir=None, mmap=True):
+    """
+    Load the students data of the CSV `path` from its compact cache, the
+    cache being (re)built when missing or outdated
+    """
+    cache_dir = cache_dir if cache_dir else get_cache_dir(path)
+    source_fingerprint = get_source_fingerprint(path)
+    version_dir = get_version_dir(cache_dir, source_fingerprint)
+    if read_cache_meta(version_dir) is None:
+        frame = pd.read_csv(path, index_col=INDEX_COLUMN)
+        validate_student_data(frame)
+        write_cache(compact_student_data(frame), cache_dir,
+                    source_fingerprint)
+        prune_cache(cache_dir, version_dir)
+    try:
+        return read_cache(version_dir, mmap=mmap)
+    except FileNotFoundError:
+        # pruned meanwhile by a process loading a newer source version
+        return load_student_data(path, cache_dir=cache_dir, mmap=mmap)
@@ -4,6 +4,24 @@ Baseline improvement strategy model
 
 import pandas as pd
 from .base_improvement_strategy import BaseImprovementStrategy
+from .instrumentation import span
+
+
+def compute_improvement_levels(X: pd.DataFrame, strategy_config: dict,
+                               metadata: dict):
+    """
+    Whole-column improvement levels of `strategy_config` applied on `X`:
+    1 for every changed binary feature and the absolute distance to the
+    target value for numeric features.
+    """
+    improvement_levels = {}
+    for feature, target_value in strategy_config.items():
+        if feature in metadata["binary"]:
+            improvement_levels[feature] = (X[feature] !=
+                                           target_value).astype("int64")
+        elif feature in metadata["numeric"]:
+            improvement_levels[feature] = abs(X[feature] - target_value)
+    return improvement_levels
 
 
 class DefaultImprovementStrategy(BaseImprovementStrategy):
@@ -37,23 +55,13 @@ class DefaultImprovementStrategy(BaseImprovementStrategy):
 
     def apply_improvement_strategy(self):
         """Implement default strategy"""
-        student_impovement_data = {key: [] for key in self.actionable_features}
-        for student_id in self.X.index:
+        with span("strategy.improvement_levels", rows=len(self.X)):
+            improvement_levels = compute_improvement_levels(
+                self.X_target, self.strategy_config, self.metadata)
             for feature, target_value in self.strategy_config.items():
-                if feature in self.metadata["binary"]:
-                    complexity_val = 1 if self.X_target.loc[student_id][
-                        feature] != target_value else 0
-                    student_impovement_data[feature].append(complexity_val)
-                elif feature in self.metadata["numeric"]:
-                    complexity_val = abs(
-                        self.X_target.loc[student_id][feature] -
-                        target_value) if self.X_target.loc[student_id][
-                            feature] != target_value else 0
-                    student_impovement_data[feature].append(complexity_val)
-                self.X_target.at[student_id, feature] = target_value
-
-        for feature, values in student_impovement_data.items():
-            self.X_target[f"{feature}_implevel"] = values
+                self.X_target[feature] = target_value
+            for feature, values in improvement_levels.items():
+                self.X_target[f"{feature}_implevel"] = values
 
         self.infer_and_setup_expected_grades()
         self.setup_performance_gain()
@@ -61,16 +69,20 @@ class DefaultImprovementStrategy(BaseImprovementStrategy):
 
     def infer_and_setup_expected_grades(self):
         """Infer the expected grades under the current strategy"""
-        model_features = list(self.X.columns)
-        expected_grades = self.inference_model.predict(
-            self.X_target[model_features])
-        self.X_target["ExpectedGrade"] = expected_grades
+        with span("strategy.expected_grades", rows=len(self.X)):
+            if self.inference_model.supports_delta_scoring:
+                expected_grades = self.inference_model.predict_delta(
+                    self.X, self.X_target, self.actionable_features)
+            else:
+                expected_grades = self.inference_model.predict(self.X_target)
+            self.X_target["ExpectedGrade"] = expected_grades
 
     def setup_heuristic_complexity(self):
         """Setup a mesure of student improvability's complexity"""
-        self.X_target["Complexity"] = self.X_target[[
-            f"{feat}_implevel" for feat in self.actionable_features
-        ]].sum(axis=1)
+        with span("strategy.complexity", rows=len(self.X)):
+            self.X_target["Complexity"] = self.X_target[[
+                f"{feat}_implevel" for feat in self.actionable_features
+            ]].sum(axis=1)
 
     def setup_performance_gain(self):
         """Setup a mesure of counseling value"""
@@ -0,0 +1,56 @@
+"""
+On-demand export of students data.
+
+Frames are only serialized when an export is requested, row chunk by row
+chunk, as plain CSV, gzip compressed CSV or Parquet (the latter requiring
+`pyarrow`).
+"""
+
+import gzip
+import io
+import pandas as pd
+from .instrumentation import span
+
+EXPORT_FORMATS = {
+    "csv": {
+        "extension": "csv",
+        "mime": "text/csv"
+    },
+    "csv.gz": {
+        "extension": "csv.gz",
+        "mime": "application/gzip"
+    },
+    "parquet": {
+        "extension": "parquet",
+        "mime": "application/vnd.apache.parquet"
+    }
+}
+
+
+def iter_csv_chunks(frame: pd.DataFrame, chunk_size=50_000):
+    """Encoded CSV chunks of `frame`, the header being in the first one"""
+    for start in range(0, max(len(frame), 1), chunk_size):
+        yield frame.iloc[start:start + chunk_size].to_csv(
+            header=start == 0).encode("utf-8")
+
+
+def serialize_frame(frame: pd.DataFrame, export_format="csv",
+                    chunk_size=50_000):
+    """Serialize `frame` in one of the `EXPORT_FORMATS`"""
+    assert export_format in EXPORT_FORMATS
+    buffer = io.BytesIO()
+    with span(f"export.{export_format}", rows=len(frame)):
+        if export_format == "parquet":
+            try:
+                frame.to_parquet(buffer)
+            except ImportError as error:
+                raise ImportError(
+                    "Parquet exports require `pyarrow`") from error
+        elif export_format == "csv.gz":
+            with gzip.GzipFile(fileobj=buffer, mode="wb") as file:
+                for chunk in iter_csv_chunks(frame, chunk_size):
+                    file.write(chunk)
+        else:
+            for chunk in iter_csv_chunks(frame, chunk_size):
+                buffer.write(chunk)
+    return buffer.getvalue()
@@ -0,0 +1,195 @@
+"""
+Incremental rescoring of a growing students file.
+
+The per-student results of a strategy run are persisted, keyed by StudentID,
+together with a hash of each student's feature row (and final grade). The
+store of a run is specific to a dataset, a grading model and encoder version
+and a strategy config.
+On the next run, only the new or changed students go through
+`apply_improvement_strategy` and `predict`, the results of the others being
+merged back from the store, so that a daily update costs in proportion to
+the size of the change instead of the size of the cohort.
+"""
+
+import logging
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from joblib import dump
+from .default_improvement_strategy import DefaultImprovementStrategy
+from .instrumentation import span
+from .model_registry import get_model_registry
+from .result_cache import file_fingerprint, make_cache_key
+from .utils import load_joblib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(".cache", "incremental_scores")
+ROW_HASH_COLUMN = "RowHash"
+MEASURE_COLUMNS = ["ExpectedGrade", "PerformanceGain", "Complexity"]
+
+
+def row_hashes(X: pd.DataFrame, y: pd.Series = None):
+    """
+    Content hash of each student row, independent of the columns order and
+    of the compact (categorical, downcast integer) column types
+    """
+    columns = dict()
+    for column in sorted(X.columns):
+        values = X[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            values = values.astype("int64")
+        columns[column] = values
+    if y is not None:
+        columns["__target__"] = y.astype("float64")
+    return pd.util.hash_pandas_object(pd.DataFrame(columns, index=X.index),
+                                      index=False).to_numpy()
+
+
+class IncrementalResultStore:
+    """
+    On-disk store of the per-student results of one dataset, grading model
+    and encoder version and strategy config, the least recently written
+    stores being pruned beyond `max_stores`
+    """
+
+    def __init__(self,
+                 model_version,
+                 strategy_config,
+                 store_dir=DEFAULT_STORE_DIR,
+                 max_stores=64,
+                 encoder_version=None,
+                 dataset=None):
+        self.store_dir = store_dir
+        self.max_stores = max_stores
+        self.key = make_cache_key(
+            os.path.abspath(dataset) if dataset else None, {
+                "model": model_version,
+                "encoder": encoder_version
+            }, strategy_config)
+        self.path = os.path.join(store_dir, f"{self.key}.joblib")
+
+    def load(self):
+        """Stored results indexed by StudentID, None when there are none"""
+        try:
+            return load_joblib(self.path)
+        except (OSError, EOFError, ValueError):
+            return None
+
+    def save(self, results: pd.DataFrame):
+        """Atomically replace the stored results"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.store_dir,
+                                                     suffix=".tmp")
+        os.close(file_descriptor)
+        dump(results, tmp_path)
+        os.replace(tmp_path, self.path)
+        self.prune()
+
+    def prune(self):
+        """Remove the least recently written stores beyond `max_stores`"""
+        paths = [
+            os.path.join(self.store_dir, filename)
+            for filename in os.listdir(self.store_dir)
+            if filename.endswith(".joblib")
+        ]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_stores:]:
+            os.remove(path)
+
+
+class IncrementalImprovementStrategy(DefaultImprovementStrategy):
+    """
+    Default improvement strategy only rescoring the students that are new or
+    changed since the previous run on the same dataset (e.g. its path) with
+    the same model, encoder and config. Students are matched by their
+    (unique) StudentID.
+    """
+
+    def __init__(self,
+                 X: pd.DataFrame,
+                 y=None,
+                 strategy_config=None,
+                 inference_model=None,
+                 model_version=None,
+                 store_dir=DEFAULT_STORE_DIR,
+                 encoder_version=None,
+                 dataset=None):
+        if not X.index.is_unique:
+            duplicates = X.index[X.index.duplicated()].unique()
+            raise ValueError(
+                f"Incremental scoring requires unique student ids, found "
+                f"duplicates: {duplicates[:10].tolist()}")
+        super().__init__(X=X,
+                         y=y,
+                         strategy_config=strategy_config,
+                         inference_model=inference_model)
+        if model_version is None:
+            model_version = self.get_model_version()
+        if encoder_version is None:
+            encoder_version = self.get_encoder_version()
+        self.store = IncrementalResultStore(model_version,
+                                            self.strategy_config,
+                                            store_dir=store_dir,
+                                            encoder_version=encoder_version,
+                                            dataset=dataset)
+        # number of students scored and reused by the last run
+        self.n_rescored = 0
+        self.n_reused = 0
+
+    def get_model_version(self):
+        """Version of the inference model artifact, used in the store key"""
+        model_name = getattr(self.inference_model, "model_name", None)
+        if model_name is None:
+            return type(self.inference_model).__name__
+        return file_fingerprint(get_model_registry().get_path(model_name))
+
+    def get_encoder_version(self):
+        """Version of the encoder artifact (if any), used in the store key"""
+        encoder_name = getattr(self.inference_model, "encoder_name", None)
+        if encoder_name is None:
+            return None
+        return file_fingerprint(get_model_registry().get_path(encoder_name))
+
+    def apply_improvement_strategy(self):
+        """Rescore the new and changed students, reuse the others"""
+        with span("strategy.row_hashes", rows=len(self.X)):
+            hashes = row_hashes(self.X, self.y)
+            stored = self.store.load()
+            reusable = np.zeros(len(self.X), dtype=bool)
+            if stored is not None:
+                stored_hashes = stored[ROW_HASH_COLUMN].reindex(
+                    self.X.index).to_numpy()
+                reusable = stored_hashes == hashes
+        changed = ~reusable
+        self.n_rescored = int(changed.sum())
+        self.n_reused = len(self.X) - self.n_rescored
+        logger.info("incremental scoring: %d rescored, %d reused",
+                    self.n_rescored, self.n_reused)
+
+        result_columns = [
+            f"{feature}_implevel" for feature in self.actionable_features
+        ] + MEASURE_COLUMNS
+        parts = []
+        if self.n_reused:
+            parts.append(stored.loc[self.X.index[reusable], result_columns])
+        if self.n_rescored:
+            # the cohort itself is passed when every student changed, so that
+            # a shared model reuses its baseline grades
+            estimator = DefaultImprovementStrategy(
+                self.X[changed] if self.n_reused else self.X,
+                self.y[changed] if self.n_reused else self.y,
+                strategy_config=self.strategy_config,
+                inference_model=self.inference_model)
+            estimator.apply_improvement_strategy()
+            parts.append(estimator.X_target[result_columns])
+        results = pd.concat(parts).reindex(self.X.index)
+
+        for feature, target_value in self.strategy_config.items():
+            self.X_target[feature] = target_value
+        for column in result_columns:
+            self.X_target[column] = results[column]
+        if stored is None or self.n_rescored or len(stored) != len(self.X):
+            results[ROW_HASH_COLUMN] = hashes
+            self.store.save(results)
@@ -0,0 +1,135 @@
+"""
+Lightweight per-stage timing instrumentation.
+
+Stages are wrapped in `span` context managers (or `timed` decorators) that
+record their wall time, processed rows and, optionally, their net traced
+memory allocations. Each record is emitted as a structured (JSON) log line
+and kept in the records of the current run (e.g. a dashboard rerun) of the
+calling thread.
+
+Instrumentation is disabled by default, `span` then returns a shared no-op
+context manager so that the overhead stays negligible. It is enabled with
+`enable_timing()` or the `COUNSELING_TIMING=1` environment variable
+(`COUNSELING_TRACE_ALLOCATIONS=1` to also trace allocations).
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_settings = {"enabled": False, "trace_allocations": False}
+_local = threading.local()
+
+
+def _environment_flag(name):
+    """Whether the environment variable `name` is set to a non-zero value"""
+    return os.environ.get(name, "0") not in ("", "0")
+
+
+def enable_timing(enabled=True, trace_allocations=False):
+    """Enable (or disable) the timing instrumentation"""
+    _settings["enabled"] = enabled
+    _settings["trace_allocations"] = enabled and trace_allocations
+    if _settings["trace_allocations"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# settings of the environment, tracing allocations from the start
+enable_timing(_environment_flag("COUNSELING_TIMING"),
+              trace_allocations=_environment_flag(
+                  "COUNSELING_TRACE_ALLOCATIONS"))
+
+
+def timing_enabled():
+    """Whether the timing instrumentation is enabled"""
+    return _settings["enabled"]
+
+
+def start_run():
+    """Start a new run, e.g. a dashboard rerun, for the calling thread"""
+    _local.records = []
+    return _local.records
+
+
+def get_run_records():
+    """Records of the current run of the calling thread"""
+    return getattr(_local, "records", [])
+
+
+class _NullSpan:
+    """No-op span used when the instrumentation is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_rows(self, rows):
+        """Set the number of processed rows"""
+
+
+_null_span = _NullSpan()
+
+
+class Span:
+    """Timed stage"""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._start = None
+        self._allocated = None
+
+    def set_rows(self, rows):
+        """Set the number of processed rows"""
+        self.rows = rows
+
+    def __enter__(self):
+        if _settings["trace_allocations"] and tracemalloc.is_tracing():
+            self._allocated = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record = {
+            "stage": self.name,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "rows": self.rows
+        }
+        if self._allocated is not None:
+            record["allocated_bytes"] = (tracemalloc.get_traced_memory()[0] -
+                                         self._allocated)
+        get_run_records().append(record)
+        logger.info(json.dumps(record))
+        return False
+
+
+def span(name, rows=None):
+    """Context manager timing the stage `name`"""
+    if not _settings["enabled"]:
+        return _null_span
+    return Span(name, rows)
+
+
+def timed(name):
+    """Decorator timing each call as the stage `name`"""
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _settings["enabled"]:
+                return function(*args, **kwargs)
+            with Span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,82 @@
+"""
+Process-wide registry of the versioned grading models and encoders.
+
+Each `joblib` artifact is loaded once per process and the same instance is
+handed out to every caller, it must thus be treated as read-only. An artifact
+is reloaded when its file changes on disk, so that a new model version can be
+dropped in place without restarting the application.
+"""
+
+import hashlib
+import os
+import threading
+from .utils import load_joblib
+
+DEFAULT_MODELS_DIR = "./assets/models"
+
+
+class ModelRegistry:
+    """Registry of shared model/encoder instances looked up by name"""
+
+    def __init__(self, models_dir=DEFAULT_MODELS_DIR, check_hash=False):
+        self.models_dir = models_dir
+        # when enabled, a file whose mtime/size changed is only reloaded if
+        # its content hash changed as well
+        self.check_hash = check_hash
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+    def get_path(self, name):
+        """Path of the artifact `name`"""
+        return os.path.join(self.models_dir, f"{name}.joblib")
+
+    def get(self, name):
+        """Returns the shared instance of artifact `name`"""
+        path = self.get_path(name)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry["stamp"] == stamp:
+                return entry["object"]
+            digest = self._file_digest(path) if self.check_hash else None
+            if entry is None or digest is None or entry["digest"] != digest:
+                entry = {"object": load_joblib(path), "digest": digest}
+                self._entries[name] = entry
+            entry["stamp"] = stamp
+            return entry["object"]
+
+    def warm_up(self, names):
+        """Load the artifacts `names` ahead of the first request"""
+        for name in names:
+            self.get(name)
+
+    def invalidate(self, name=None):
+        """Drop artifact `name` (all artifacts by default) from the registry"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def loaded_names(self):
+        """Names of the currently loaded artifacts"""
+        with self._lock:
+            return sorted(self._entries)
+
+    @staticmethod
+    def _file_digest(path):
+        """sha256 digest of the file content"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+_model_registry = ModelRegistry()
+
+
+def get_model_registry():
+    """Returns the process-wide model registry"""
+    return _model_registry
@@ -0,0 +1,224 @@
+"""
+Optimal improvement strategy: a per-student strategy search.
+
+For each student, the search looks for the actionable features values that
+maximize the expected `PerformanceGain` while keeping the heuristic
+`Complexity` within a budget. Each feature either keeps the student's current
+value or takes one of the values allowed by `get_all_actionable_features`.
+
+With a linear grading model, the gain and the complexity are both additive
+over the features, so the search is an exact multiple-choice knapsack solved
+by dynamic programming over the (integer) complexity budget, vectorized over
+students. Other models fall back to a bounded greedy search that changes the
+best feature per round.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .default_improvement_strategy import DefaultImprovementStrategy
+from .utils import get_all_actionable_features
+
+
+def get_feature_options(actionable_features):
+    """Candidate target values of every actionable feature"""
+    feature_options = dict()
+    for feature, conf in actionable_features.items():
+        if conf["type"] == "numeric":
+            feature_options[feature] = np.arange(conf["min"], conf["max"] + 1)
+        else:
+            feature_options[feature] = np.array(conf["options"], dtype=object)
+    return feature_options
+
+
+def get_option_costs(current_values, options, feature_type):
+    """Complexity of moving each student to each option, (n, n_options)"""
+    if feature_type == "numeric":
+        return np.abs(options[None, :] -
+                      current_values.astype(float)[:, None])
+    return (options[None, :] != current_values[:, None]).astype(float)
+
+
+def solve_knapsack(gains, costs, max_complexity):
+    """
+    Multiple-choice knapsack solved for all the students at once. `gains`
+    and `costs` hold, for each feature, an (n, n_options) array whose first
+    option is the zero-cost, zero-gain current value. Returns the selected
+    option index of each feature.
+    """
+    n_students = len(gains[0])
+    rows = np.arange(n_students)
+    budgets = np.arange(max_complexity + 1)
+    best = np.zeros((n_students, max_complexity + 1))
+    choices = []
+    for feature_gains, feature_costs in zip(gains, costs):
+        new_best = np.full_like(best, -np.inf)
+        choice = np.zeros(best.shape, dtype=np.int16)
+        for option_idx in range(feature_gains.shape[1]):
+            remaining = budgets[None, :] - feature_costs[:, [option_idx]]
+            feasible = remaining >= 0
+            candidate = best[rows[:, None], np.maximum(remaining, 0)]
+            candidate += feature_gains[:, [option_idx]]
+            better = feasible & (candidate > new_best)
+            new_best[better] = candidate[better]
+            choice[better] = option_idx
+        best = new_best
+        choices.append(choice)
+
+    remaining = np.full(n_students, max_complexity)
+    selected = []
+    for choice, feature_costs in zip(reversed(choices), reversed(costs)):
+        option_idx = choice[rows, remaining]
+        remaining = remaining - feature_costs[rows, option_idx]
+        selected.append(option_idx)
+    return selected[::-1]
+
+
+def _solve_knapsack_task(args):
+    """Process pool entry point of `solve_knapsack`"""
+    return solve_knapsack(*args)
+
+
+def greedy_search(inference_model, X, feature_options, feature_types,
+                  max_complexity):
+    """
+    Bounded greedy search for any grading model: each round applies, for
+    every student, the single feature change that improves the expected
+    grade the most within the remaining budget. All the candidate changes of
+    a round are scored with one `predict` call. Returns the target values of
+    each feature.
+    """
+    n_students = len(X)
+    targets = {feature: X[feature].to_numpy() for feature in feature_options}
+    feature_costs = {feature: np.zeros(n_students) for feature in targets}
+    expected_grades = np.asarray(inference_model.predict(X), dtype=float)
+    candidates = [(feature, value)
+                  for feature, options in feature_options.items()
+                  for value in options]
+    for _ in range(len(feature_options)):
+        current = X.assign(**targets)
+        stacked = pd.concat(
+            [current.assign(**{feature: value})
+             for feature, value in candidates],
+            ignore_index=True)
+        candidate_grades = np.asarray(inference_model.predict(stacked),
+                                      dtype=float).reshape(
+                                          len(candidates), n_students)
+        total_cost = np.sum(list(feature_costs.values()), axis=0)
+        candidate_costs = np.empty_like(candidate_grades)
+        for candidate_idx, (feature, value) in enumerate(candidates):
+            candidate_costs[candidate_idx] = total_cost - feature_costs[
+                feature] + get_option_costs(X[feature].to_numpy(),
+                                            np.array([value], dtype=object),
+                                            feature_types[feature])[:, 0]
+        candidate_grades[candidate_costs > max_complexity] = -np.inf
+        best_candidate = candidate_grades.argmax(axis=0)
+        best_grades = candidate_grades[best_candidate, np.arange(n_students)]
+        improved = best_grades > expected_grades + 1e-12
+        if not improved.any():
+            break
+        for candidate_idx in np.unique(best_candidate[improved]):
+            feature, value = candidates[candidate_idx]
+            rows = improved & (best_candidate == candidate_idx)
+            targets[feature] = targets[feature].copy()
+            targets[feature][rows] = value
+            feature_costs[feature][rows] = candidate_costs[
+                candidate_idx, rows] - (total_cost[rows] -
+                                        feature_costs[feature][rows])
+        expected_grades = np.where(improved, best_grades, expected_grades)
+    return targets
+
+
+class OptimalImprovementStrategy(DefaultImprovementStrategy):
+    """
+    Per-student improvement strategy maximizing the performance gain under a
+    maximum complexity
+    """
+
+    def __init__(self,
+                 X: pd.DataFrame,
+                 y=None,
+                 max_complexity=10,
+                 actionable_features=None,
+                 inference_model=None,
+                 n_jobs=1,
+                 chunk_size=20_000):
+        if actionable_features is None:
+            actionable_features = get_all_actionable_features()
+        super().__init__(X=X,
+                         y=y,
+                         strategy_config={
+                             feature: conf["default"]
+                             for feature, conf in actionable_features.items()
+                         },
+                         inference_model=inference_model)
+        self.strategy_name = "OptimalImprovementStrategy"
+        self.max_complexity = int(max_complexity)
+        self.feature_types = {
+            feature: conf["type"]
+            for feature, conf in actionable_features.items()
+        }
+        self.feature_options = get_feature_options(actionable_features)
+        # number of worker processes and students per task of the search
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+    def apply_improvement_strategy(self):
+        """Search the optimal per-student strategy and apply it"""
+        if self.inference_model.supports_delta_scoring:
+            targets = self.search_linear()
+        else:
+            targets = greedy_search(self.inference_model, self.X,
+                                    self.feature_options, self.feature_types,
+                                    self.max_complexity)
+        # the strategy config now holds the per-student target values
+        self.strategy_config = {
+            feature: pd.Series(values, index=self.X.index)
+            for feature, values in targets.items()
+        }
+        super().apply_improvement_strategy()
+
+    def search_linear(self):
+        """
+        Exact search for linear grading models, returns the target values
+        of each feature
+        """
+        gains, costs, values = [], [], []
+        for feature, options in self.feature_options.items():
+            current_values = self.X[feature].to_numpy()
+            # the first option keeps the current value at no cost
+            option_costs = get_option_costs(current_values, options,
+                                            self.feature_types[feature])
+            costs.append(
+                np.hstack([np.zeros((len(self.X), 1)),
+                           np.ceil(option_costs)]).astype(np.int64))
+            option_gains = self.inference_model.feature_contributions(
+                feature, pd.Series(options))[None, :] - (
+                    self.inference_model.feature_contributions(
+                        feature, self.X[feature])[:, None])
+            gains.append(np.hstack([np.zeros((len(self.X), 1)),
+                                    option_gains]))
+            values.append((current_values, options))
+
+        chunks = [
+            ([feature_gains[start:start + self.chunk_size]
+              for feature_gains in gains],
+             [feature_costs[start:start + self.chunk_size]
+              for feature_costs in costs], self.max_complexity)
+            for start in range(0, len(self.X), self.chunk_size)
+        ]
+        if self.n_jobs == 1 or len(chunks) == 1:
+            selections = list(map(_solve_knapsack_task, chunks))
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                selections = list(executor.map(_solve_knapsack_task, chunks))
+
+        targets = dict()
+        for feature_idx, feature in enumerate(self.feature_options):
+            option_idx = np.concatenate(
+                [selection[feature_idx] for selection in selections])
+            current_values, options = values[feature_idx]
+            targets[feature] = np.where(
+                option_idx == 0, current_values,
+                options[np.maximum(option_idx - 1, 0)])
+        return targets
@@ -0,0 +1,121 @@
+"""
+Multi-core sharded scoring of the improvement strategy.
+
+Students are independent, so a cohort is split into shards, by a shard key
+column such as `school` and/or in fixed-size row blocks, that are scored by a
+pool of worker processes. Each worker loads the grading model artifacts once
+through its own registry, and the shard results are merged back in StudentID
+order so that the output does not depend on the scheduling.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .baseline_grader_model import BaselineGraderModel
+from .default_improvement_strategy import DefaultImprovementStrategy
+from .model_registry import DEFAULT_MODELS_DIR, ModelRegistry
+
+OUTPUT_COLUMNS = ["Complexity", "ExpectedGrade", "PerformanceGain"]
+
+# per-process scoring state, set by `_init_worker`
+_worker_state = dict()
+
+
+def _init_worker(model_name, encoder_name, models_dir):
+    """Load the grading model artifacts once per worker process"""
+    registry = ModelRegistry(models_dir)
+    registry.warm_up([model_name, encoder_name])
+    _worker_state.update(registry=registry,
+                         model_name=model_name,
+                         encoder_name=encoder_name,
+                         init_args=(model_name, encoder_name, models_dir))
+
+
+def _score_shard(X, y, strategy_config):
+    """Score one shard of students in a worker process"""
+    inference_model = BaselineGraderModel(
+        X,
+        model_name=_worker_state["model_name"],
+        encoder_name=_worker_state["encoder_name"],
+        registry=_worker_state["registry"])
+    estimator = DefaultImprovementStrategy(X,
+                                           y,
+                                           strategy_config=strategy_config,
+                                           inference_model=inference_model)
+    estimator.apply_improvement_strategy()
+    return estimator.X_target[OUTPUT_COLUMNS]
+
+
+def split_shards(X: pd.DataFrame, shard_by=None, chunk_size=100_000):
+    """
+    Row positions of each shard: one group per `shard_by` value (if given),
+    each group being split in blocks of at most `chunk_size` rows
+    """
+    if shard_by is None:
+        groups = [range(len(X))]
+    else:
+        groups = X.groupby(shard_by, sort=True, observed=True).indices.values()
+    return [
+        group[start:start + chunk_size] for group in groups
+        for start in range(0, len(group), chunk_size)
+    ]
+
+
+class ShardedStrategyScorer:
+    """
+    Scores improvement strategies with a pool of worker processes, to be
+    closed after use (or used as a context manager). Without `chunk_size`,
+    each scored frame is split in one shard per worker.
+    """
+
+    def __init__(self,
+                 strategy_config=None,
+                 n_workers=None,
+                 chunk_size=None,
+                 shard_by=None,
+                 model_name="grader-model-v1",
+                 encoder_name="grader-encoder-v1",
+                 models_dir=DEFAULT_MODELS_DIR):
+        self.strategy_config = strategy_config
+        self.n_workers = n_workers if n_workers else os.cpu_count()
+        self.chunk_size = chunk_size
+        self.shard_by = shard_by
+        self._init_args = (model_name, encoder_name, models_dir)
+        self._executor = None
+
+    def score(self, X: pd.DataFrame, y: pd.Series):
+        """
+        Complexity, ExpectedGrade and PerformanceGain of the students `X`,
+        sorted by StudentID
+        """
+        chunk_size = self.chunk_size if self.chunk_size else max(
+            1, math.ceil(len(X) / self.n_workers))
+        shards = split_shards(X, self.shard_by, chunk_size)
+        shard_args = ([X.iloc[positions] for positions in shards],
+                      [y.iloc[positions] for positions in shards],
+                      [self.strategy_config] * len(shards))
+        if self.n_workers == 1:
+            if _worker_state.get("init_args") != self._init_args:
+                _init_worker(*self._init_args)
+            results = map(_score_shard, *shard_args)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    initializer=_init_worker,
+                    initargs=self._init_args)
+            results = self._executor.map(_score_shard, *shard_args)
+        return pd.concat(list(results)).sort_index(kind="stable")
+
+    def close(self):
+        """Shut the worker processes down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,121 @@
+"""
+Prioritization of the students of a strategy result.
+
+Advisors look for the students giving the most `PerformanceGain` for the
+least `Complexity`. The non-dominated students (no other student has a
+higher or equal gain for a lower or equal complexity, one of them being
+strictly better) form the Pareto front, computed in O(n log n) with one sort
+and a running maximum. Shortlists of the K best students by gain, by gain
+per complexity unit or by a weighted score are selected in O(n + k log k)
+with a partial sort, the whole frame never being sorted.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRIORITY_CRITERIA = {
+    "gain": "Performance gain",
+    "ratio": "Performance gain per complexity unit",
+    "weighted": "Performance gain - weight × complexity"
+}
+
+
+def pareto_front_positions(gain, complexity):
+    """
+    Positions of the non-dominated (gain ↑, complexity ↓) students, ordered
+    by increasing complexity (and so increasing gain)
+    """
+    gain, complexity = np.asarray(gain), np.asarray(complexity)
+    if len(gain) == 0:
+        return np.empty(0, dtype=np.intp)
+    # by increasing complexity, the highest gain first within a complexity
+    order = np.lexsort((-gain, complexity))
+    sorted_gain, sorted_complexity = gain[order], complexity[order]
+    group_start = np.searchsorted(sorted_complexity,
+                                  sorted_complexity,
+                                  side="left")
+    running_max = np.maximum.accumulate(sorted_gain)
+    # best gain among the students of strictly lower complexity
+    lower_max = np.where(group_start > 0,
+                         running_max[np.maximum(group_start - 1, 0)],
+                         -np.inf)
+    on_front = (sorted_gain == sorted_gain[group_start]) & (sorted_gain >
+                                                            lower_max)
+    return order[on_front]
+
+
+def priority_scores(gain, complexity, criterion="gain", complexity_weight=1.):
+    """
+    Priority score of each student: its gain, its gain per complexity unit
+    (a zero complexity counting as one) or its gain minus
+    `complexity_weight` times its complexity
+    """
+    gain = np.asarray(gain, dtype=float)
+    complexity = np.asarray(complexity, dtype=float)
+    if criterion == "gain":
+        return gain
+    if criterion == "ratio":
+        return gain / np.maximum(complexity, 1.)
+    if criterion == "weighted":
+        return gain - complexity_weight * complexity
+    raise ValueError(f"Unknown priority criterion {criterion}, expected one "
+                     f"of {list(PRIORITY_CRITERIA)}")
+
+
+def top_k_positions(scores, k):
+    """Positions of the `k` highest `scores`, by decreasing score"""
+    scores = np.asarray(scores)
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class PrioritizationIndex:
+    """Pareto front and top-K shortlists of the students of `frame`"""
+
+    def __init__(self,
+                 frame: pd.DataFrame,
+                 gain="PerformanceGain",
+                 complexity="Complexity"):
+        self.frame = frame
+        self.gain = gain
+        self.complexity = complexity
+        self._gain_values = frame[gain].to_numpy()
+        self._complexity_values = frame[complexity].to_numpy()
+        self._pareto_positions = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def nbytes(self):
+        """Memory size of the computed positions (the frame not included)"""
+        if self._pareto_positions is None:
+            return 0
+        return self._pareto_positions.nbytes
+
+    def pareto_front_positions(self):
+        """Positions of the Pareto front, computed once"""
+        if self._pareto_positions is None:
+            self._pareto_positions = pareto_front_positions(
+                self._gain_values, self._complexity_values)
+        return self._pareto_positions
+
+    def pareto_front(self):
+        """Students of the Pareto front, by increasing complexity"""
+        return self.frame.iloc[self.pareto_front_positions()]
+
+    def top_k(self, k, criterion="gain", complexity_weight=1.):
+        """
+        The `k` students of highest priority score under `criterion`, with
+        their `PriorityScore`
+        """
+        scores = priority_scores(self._gain_values,
+                                 self._complexity_values,
+                                 criterion=criterion,
+                                 complexity_weight=complexity_weight)
+        positions = top_k_positions(scores, k)
+        return self.frame.iloc[positions].assign(
+            PriorityScore=scores[positions])
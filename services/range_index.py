@@ -0,0 +1,65 @@
+"""
+Range query index over the output measures of a strategy result.
+
+The index is built once per strategy result and keeps, for each measure, the
+positions of the rows sorted by that measure. A range filter is then answered
+by a binary search on the sort measure (O(log n)) followed by checks of the
+other ranges on the k matching rows only, the result being already ordered.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class MeasureRangeIndex:
+    """Sorted-array index of the `measures` columns of `frame`"""
+
+    def __init__(self, frame: pd.DataFrame, measures):
+        self.frame = frame
+        self.measures = list(measures)
+        self._values = dict()
+        self._orders = dict()
+        self._sorted_values = dict()
+        for measure in self.measures:
+            values = frame[measure].to_numpy()
+            order = np.argsort(values, kind="stable")
+            self._values[measure] = values
+            self._orders[measure] = order
+            self._sorted_values[measure] = values[order]
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def nbytes(self):
+        """Memory size of the index arrays (the frame is not included)"""
+        return sum(
+            self._orders[measure].nbytes + self._sorted_values[measure].nbytes
+            for measure in self.measures)
+
+    def bounds(self, measure):
+        """Minimum and maximum of `measure`"""
+        sorted_values = self._sorted_values[measure]
+        return sorted_values[0], sorted_values[-1]
+
+    def query_positions(self, ranges: dict, sort_by, ascending=True):
+        """
+        Positions of the rows whose measures lie within the inclusive
+        `ranges` ({measure: (low, high)}), ordered by `sort_by`
+        """
+        low, high = ranges.get(sort_by, (-np.inf, np.inf))
+        sorted_values = self._sorted_values[sort_by]
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+        positions = self._orders[sort_by][start:stop]
+        for measure, (low, high) in ranges.items():
+            if measure == sort_by:
+                continue
+            values = self._values[measure][positions]
+            positions = positions[(values >= low) & (values <= high)]
+        return positions if ascending else positions[::-1]
+
+    def query(self, ranges: dict, sort_by, ascending=True):
+        """Rows of the frame matching `ranges`, ordered by `sort_by`"""
+        return self.frame.iloc[self.query_positions(ranges, sort_by,
+                                                    ascending)]
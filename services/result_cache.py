@@ -0,0 +1,154 @@
+"""
+Cache of improvement strategy results.
+
+Results are keyed by a canonical hash of the dataset fingerprint, the grading
+model version and the strategy configuration, and kept in a bounded LRU that
+evicts the least recently used results once the entries count or their
+estimated memory size exceed the configured limits.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+from .model_registry import get_model_registry
+from .strategy_result import StrategyResult
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path):
+    """Cheap fingerprint of a file based on its path, size and mtime"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def artifacts_version(names, registry=None):
+    """
+    Version of the model artifacts `names` (e.g. a model and its encoder),
+    changing whenever one of their files changes
+    """
+    registry = registry if registry is not None else get_model_registry()
+    return "|".join(
+        file_fingerprint(registry.get_path(name)) for name in names)
+
+
+def frame_fingerprint(frame: pd.DataFrame):
+    """Content fingerprint of a dataframe (index, columns and values)"""
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, frame.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).values)
+    return digest.hexdigest()
+
+
+def make_cache_key(dataset_fingerprint, model_version, strategy_config):
+    """Canonical hash of a strategy run"""
+    payload = json.dumps(
+        {
+            "dataset": dataset_fingerprint,
+            "model": model_version,
+            "strategy": strategy_config
+        },
+        sort_keys=True,
+        default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def estimate_nbytes(value):
+    """Estimated memory size of a cached strategy result"""
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, StrategyResult):
+        return value.nbytes
+    frame = getattr(value, "X_target", value)
+    if isinstance(frame, pd.DataFrame):
+        return int(frame.memory_usage(deep=True).sum())
+    if isinstance(frame, pd.Series):
+        return int(frame.memory_usage(deep=True))
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class StrategyResultCache:
+    """Thread-safe LRU cache of strategy results bounded in size"""
+
+    def __init__(self, max_entries=32, max_bytes=512 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Returns the result stored under `key` and marks it as recent"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def peek(self, key, default=None):
+        """
+        Returns the result stored under `key`, without counting a hit or a
+        miss nor marking it as recent
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """Stores `value` under `key`, evicting old results when needed"""
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            # the most recent result is always kept
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries
+                    or self.nbytes > self.max_bytes):
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Returns the result under `key`, computing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+            logger.info("result cache miss: %s", self.stats())
+        return value
+
+    def clear(self):
+        """Drop all the cached results"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current occupancy"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes
+        }
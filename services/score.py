@@ -0,0 +1,212 @@
+"""
+Headless batch scoring of a students file.
+
+The input CSV (or Parquet) file is streamed in fixed-size chunks through the
+improvement strategy and its grading model, and the output measures are
+written incrementally, so that memory stays bounded whatever the input size:
+
+    python -m services.score data/student_data.csv output.csv \\
+        --chunk-size 50000 --set studytime=3 --set paid=no
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import pandas as pd
+from .baseline_grader_model import BaselineGraderModel
+from .data_ingestion import INDEX_COLUMN, NAME_COLUMNS
+from .default_improvement_strategy import DefaultImprovementStrategy
+from .model_registry import DEFAULT_MODELS_DIR, ModelRegistry
+from .parallel_scoring import ShardedStrategyScorer
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = ["Complexity", "ExpectedGrade", "PerformanceGain"]
+TARGET_COLUMN = "FinalGrade"
+
+
+def iter_student_chunks(path, chunk_size):
+    """Stream the students file `path` by chunks of `chunk_size` rows"""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError(
+                "Reading Parquet files requires `pyarrow`") from error
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            if INDEX_COLUMN in chunk:
+                chunk = chunk.set_index(INDEX_COLUMN)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, index_col=INDEX_COLUMN,
+                               chunksize=chunk_size)
+
+
+class OutputWriter:
+    """Incremental CSV (optionally gzipped) or Parquet writer"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._parquet_writer = None
+
+    def write(self, frame: pd.DataFrame):
+        """Append `frame` to the output file"""
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(
+                    self.path, table.schema)
+            self._parquet_writer.write_table(table)
+            return
+        header = self._file is None
+        if header:
+            opener = gzip.open if self.path.endswith(".gz") else open
+            self._file = opener(self.path, "wt", newline="", encoding="utf-8")
+        frame.to_csv(self._file, header=header)
+
+    def close(self):
+        """Flush and close the output file"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def score_file(input_path,
+               output_path,
+               strategy_config=None,
+               chunk_size=50_000,
+               model_name="grader-model-v1",
+               encoder_name="grader-encoder-v1",
+               models_dir=DEFAULT_MODELS_DIR,
+               n_workers=1,
+               shard_size=None,
+               shard_by=None):
+    """
+    Score the students of `input_path` under `strategy_config` and write
+    their output measures to `output_path`. With `n_workers` > 1, each chunk
+    is split in shards (by default one per worker) scored by a pool of
+    worker processes. Returns the number of students.
+    """
+    registry = ModelRegistry(models_dir)
+    inference_model = None
+    scorer = None
+    if n_workers != 1:
+        scorer = ShardedStrategyScorer(strategy_config,
+                                       n_workers=n_workers,
+                                       chunk_size=shard_size,
+                                       shard_by=shard_by,
+                                       model_name=model_name,
+                                       encoder_name=encoder_name,
+                                       models_dir=models_dir)
+    n_students = 0
+    with OutputWriter(output_path) as writer:
+        for chunk in iter_student_chunks(input_path, chunk_size):
+            X = chunk.drop([TARGET_COLUMN] + NAME_COLUMNS,
+                           axis=1,
+                           errors="ignore")
+            if scorer is not None:
+                writer.write(scorer.score(X, chunk[TARGET_COLUMN]))
+                n_students += len(chunk)
+                logger.info("scored %d students", n_students)
+                continue
+            if inference_model is None:
+                # the model is loaded once and shared by all the chunks
+                inference_model = BaselineGraderModel(
+                    X,
+                    model_name=model_name,
+                    encoder_name=encoder_name,
+                    registry=registry)
+            estimator = DefaultImprovementStrategy(
+                X,
+                chunk[TARGET_COLUMN],
+                strategy_config=strategy_config,
+                inference_model=inference_model)
+            estimator.apply_improvement_strategy()
+            writer.write(estimator.X_target[OUTPUT_COLUMNS])
+            n_students += len(chunk)
+            logger.info("scored %d students", n_students)
+    if scorer is not None:
+        scorer.close()
+    return n_students
+
+
+def parse_strategy_config(config_path=None, assignments=None):
+    """
+    Strategy config from a JSON file and/or `feature=value` overrides, the
+    values being parsed as JSON (e.g. `Dalc=2.5`) or kept as strings
+    (e.g. `paid=no`)
+    """
+    strategy_config = dict(DefaultImprovementStrategy.default_strategy_config)
+    if config_path:
+        with open(config_path, encoding="utf-8") as file:
+            strategy_config = json.load(file)
+    for assignment in assignments or []:
+        feature, _, value = assignment.partition("=")
+        try:
+            strategy_config[feature] = json.loads(value)
+        except ValueError:
+            strategy_config[feature] = value
+    return strategy_config
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m services.score",
+        description="Score a students file under an improvement strategy")
+    parser.add_argument("input", help="students CSV or Parquet file")
+    parser.add_argument("output",
+                        help="output .csv, .csv.gz or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--config", help="strategy config JSON file")
+    parser.add_argument("--set",
+                        action="append",
+                        dest="assignments",
+                        metavar="FEATURE=VALUE",
+                        help="override a strategy config value")
+    parser.add_argument("--model-name", default="grader-model-v1")
+    parser.add_argument("--encoder-name", default="grader-encoder-v1")
+    parser.add_argument("--models-dir", default=DEFAULT_MODELS_DIR)
+    parser.add_argument("--workers",
+                        type=int,
+                        default=1,
+                        help="number of scoring processes (0: all cores)")
+    parser.add_argument("--shard-size",
+                        type=int,
+                        help="maximal rows per shard in parallel mode "
+                        "(default: the chunk rows split over the workers)")
+    parser.add_argument("--shard-by",
+                        help="shard key column in parallel mode, e.g. school")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    if not os.path.exists(args.input):
+        parser.error(f"input file not found: {args.input}")
+    score_file(args.input,
+               args.output,
+               strategy_config=parse_strategy_config(args.config,
+                                                     args.assignments),
+               chunk_size=args.chunk_size,
+               model_name=args.model_name,
+               encoder_name=args.encoder_name,
+               models_dir=args.models_dir,
+               n_workers=args.workers if args.workers > 0 else None,
+               shard_size=args.shard_size,
+               shard_by=args.shard_by)
+
+
+if __name__ == "__main__":
+    main()
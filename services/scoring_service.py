@@ -0,0 +1,389 @@
+"""
+Local micro-batching scoring service.
+
+A server process owns the grading model and encoder and serves `predict`
+requests over a Unix socket (or a local TCP port, which requires an
+authentication key). Requests arriving concurrently from many dashboard
+sessions are coalesced into micro-batches: the first request of a batch
+waits at most `max_latency` seconds for others to join, up to
+`max_batch_rows` rows, and the whole batch is scored with a single call to
+the model. `ScoringServiceClient` is the `BaseGraderModel` implementation
+talking to the server through a pool of connections.
+
+Connections exchange pickled objects, so without an authentication key only
+the current user may reach the socket: it is created owner-only, by default
+in a directory private to the user, and clients refuse sockets owned by
+another user.
+
+    python -m services.scoring_service \\
+        --address "$XDG_RUNTIME_DIR/counseling-scoring.sock"
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+import numpy as np
+import pandas as pd
+from .base_grader_model import BaseGraderModel
+from .baseline_grader_model import BaselineGraderModel
+from .model_registry import DEFAULT_MODELS_DIR, ModelRegistry
+from .result_cache import file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+
+def get_default_address():
+    """
+    Default socket path, in a directory that only the current user can
+    access (created if needed)
+    """
+    base_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    directory = os.path.join(base_dir, f"counseling-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or (
+            status.st_mode & 0o077):
+        raise PermissionError(
+            f"{directory} is not a directory private to the current user")
+    return os.path.join(directory, "scoring.sock")
+
+
+def check_socket_owner(address):
+    """Refuse a Unix socket created by another user"""
+    if os.stat(address).st_uid != os.getuid():
+        raise PermissionError(
+            f"Scoring service socket {address} is owned by another user")
+
+
+class _PendingRequest:
+    """Rows of one client request waiting for their batch to be scored"""
+
+    def __init__(self, X: pd.DataFrame):
+        self.X = X
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ScoringServer:
+    """Micro-batching server owning the grading model artifacts"""
+
+    def __init__(self,
+                 address=None,
+                 model_name="grader-model-v1",
+                 encoder_name="grader-encoder-v1",
+                 models_dir=DEFAULT_MODELS_DIR,
+                 max_batch_rows=50_000,
+                 max_latency=0.005,
+                 authkey=None,
+                 request_timeout=60.):
+        if address is None:
+            address = get_default_address()
+        if not isinstance(address, str) and authkey is None:
+            raise ValueError("Serving on a TCP port requires an authkey")
+        self.address = address
+        self.max_batch_rows = max_batch_rows
+        self.max_latency = max_latency
+        self.authkey = authkey
+        self.request_timeout = request_timeout
+        registry = ModelRegistry(models_dir)
+        self.model = BaselineGraderModel(pd.DataFrame(),
+                                         model_name=model_name,
+                                         encoder_name=encoder_name,
+                                         registry=registry)
+        self.info = {
+            "model_name": model_name,
+            "model_version": file_fingerprint(registry.get_path(model_name)),
+            "columns": self.model._numeric_features +
+            self.model._categotical_features
+        }
+        # batches and requests counters
+        self.n_batches = 0
+        self.n_requests = 0
+        self._requests = queue.Queue()
+        self._listener = None
+        self._closed = threading.Event()
+
+    def serve_forever(self):
+        """Accept client connections until `close` is called"""
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        if isinstance(self.address, str):
+            os.chmod(self.address, 0o600)
+        threading.Thread(target=self._batch_loop,
+                         name="scoring-batcher",
+                         daemon=True).start()
+        logger.info("scoring service listening on %s", self.address)
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                if self._closed.is_set():
+                    break
+                logger.exception("failed to accept a connection")
+                continue
+            threading.Thread(target=self._handle_connection,
+                             args=(connection, ),
+                             daemon=True).start()
+
+    def close(self):
+        """Stop accepting connections"""
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.close()
+
+    def _handle_connection(self, connection):
+        """Serve the requests of one client connection"""
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                except Exception as error:
+                    connection.send(("error", f"Invalid request: {error}"))
+                    continue
+                if not isinstance(message, tuple) or len(message) != 2:
+                    connection.send(("error", "Invalid request, expected a "
+                                     "(command, payload) tuple"))
+                    continue
+                command, payload = message
+                if command == "info":
+                    connection.send(("ok", self.info))
+                    continue
+                if command != "predict":
+                    connection.send(("error", f"Unknown command {command}"))
+                    continue
+                error = self._validate_payload(payload)
+                if error is not None:
+                    connection.send(("error", error))
+                    continue
+                request = _PendingRequest(payload)
+                self._requests.put(request)
+                if not request.done.wait(self.request_timeout):
+                    connection.send(("error", "Scoring timed out"))
+                elif request.error is not None:
+                    connection.send(("error", request.error))
+                else:
+                    connection.send(("ok", request.result))
+
+    def _validate_payload(self, payload):
+        """
+        Error message of an invalid `predict` payload, None when valid, so
+        that a malformed request never reaches (and fails) a batch
+        """
+        if not isinstance(payload, pd.DataFrame):
+            return (f"Invalid payload of type {type(payload).__name__}, "
+                    "expected a DataFrame")
+        missing_columns = set(self.info["columns"]) - set(payload.columns)
+        if missing_columns:
+            return f"Missing columns {sorted(missing_columns)}"
+        return None
+
+    def _next_batch(self, batch):
+        """
+        Fill `batch` with the requests of the next batch: the first pending
+        request and the ones arriving within `max_latency`, up to
+        `max_batch_rows` rows
+        """
+        batch.append(self._requests.get())
+        n_rows = len(batch[0].X)
+        deadline = time.monotonic() + self.max_latency
+        while n_rows < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_rows += len(request.X)
+
+    def _batch_loop(self):
+        """
+        Score the micro-batches, one model call per batch. Any failure is
+        reported to the requests of its batch, the loop never stops.
+        """
+        while True:
+            batch = []
+            try:
+                self._next_batch(batch)
+                stacked = pd.concat([request.X for request in batch],
+                                    ignore_index=True)
+                grades = np.asarray(self.model.predict(stacked))
+                boundaries = np.cumsum([len(request.X) for request in batch])
+                for request, result in zip(batch,
+                                           np.split(grades, boundaries[:-1])):
+                    request.result = result
+            except Exception as error:
+                logger.exception("failed to score a batch")
+                for request in batch:
+                    request.error = f"{type(error).__name__}: {error}"
+            self.n_batches += 1
+            self.n_requests += len(batch)
+            for request in batch:
+                request.done.set()
+
+
+def serve(address=None, **kwargs):
+    """Run a scoring server until the process is stopped"""
+    ScoringServer(address, **kwargs).serve_forever()
+
+
+def start_local_server(address=None, timeout=30., **kwargs):
+    """
+    Start a scoring server in a child process and wait until it accepts
+    connections, returns the process (to be terminated after use)
+    """
+    if address is None:
+        address = get_default_address()
+    process = multiprocessing.Process(target=serve,
+                                      args=(address, ),
+                                      kwargs=kwargs,
+                                      daemon=True)
+    process.start()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            Client(address, authkey=kwargs.get("authkey")).close()
+            return process
+        except (OSError, EOFError):
+            if not process.is_alive() or time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError(
+                    f"scoring service did not start on {address}")
+            time.sleep(0.05)
+
+
+class ScoringServiceClient(BaseGraderModel):
+    """
+    Grading model delegating inference to a scoring service, through a
+    thread-safe pool of at most `pool_size` connections
+    """
+
+    def __init__(self,
+                 X=None,
+                 y=None,
+                 address=None,
+                 authkey=None,
+                 pool_size=4,
+                 timeout=120.):
+        super().__init__(X, y)
+        self.address = address if address is not None else (
+            get_default_address())
+        self.authkey = authkey
+        # maximal wait for a response, beyond the server's own timeout
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._info = None
+
+    @property
+    def info(self):
+        """Model name, version and input columns served by the service"""
+        if self._info is None:
+            self._info = self._request("info", None)
+        return self._info
+
+    def predict(self, X: pd.DataFrame):
+        """Infere grade through the scoring service"""
+        return self._request("predict", X[self.info["columns"]])
+
+    def _request(self, command, payload):
+        """
+        Send one request on a pooled connection and return its result. A
+        request failing on a stale pooled connection, e.g. after a server
+        restart, is retried once on a fresh connection.
+        """
+        with self._slots:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = None
+            while True:
+                reused = connection is not None
+                if not reused:
+                    if self.authkey is None and isinstance(self.address, str):
+                        check_socket_owner(self.address)
+                    connection = Client(self.address, authkey=self.authkey)
+                try:
+                    connection.send((command, payload))
+                    if not connection.poll(self.timeout):
+                        connection.close()
+                        raise TimeoutError(
+                            f"No scoring service response within "
+                            f"{self.timeout}s")
+                    status, result = connection.recv()
+                    break
+                except TimeoutError:
+                    raise
+                except (EOFError, OSError):
+                    connection.close()
+                    if not reused:
+                        raise
+                    # the other pooled connections are most likely stale too
+                    self.close()
+                    connection = None
+            self._pool.put(connection)
+        if status != "ok":
+            raise RuntimeError(f"Scoring service error: {result}")
+        return result
+
+    def close(self):
+        """Close the pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m services.scoring_service",
+        description="Serve the grading model to local clients")
+    parser.add_argument("--address",
+                        help="Unix socket path (default: in a directory "
+                        "private to the current user)")
+    parser.add_argument("--port",
+                        type=int,
+                        help="serve on this localhost TCP port instead, "
+                        "COUNSELING_SCORING_AUTHKEY must then be set")
+    parser.add_argument("--model-name", default="grader-model-v1")
+    parser.add_argument("--encoder-name", default="grader-encoder-v1")
+    parser.add_argument("--models-dir", default=DEFAULT_MODELS_DIR)
+    parser.add_argument("--max-batch-rows", type=int, default=50_000)
+    parser.add_argument("--max-latency-ms",
+                        type=float,
+                        default=5.,
+                        help="maximal wait for a batch to fill up")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    address = ("127.0.0.1", args.port) if args.port else args.address
+    authkey = os.environ.get("COUNSELING_SCORING_AUTHKEY")
+    if args.port and not authkey:
+        parser.error("serving on a TCP port requires the "
+                     "COUNSELING_SCORING_AUTHKEY environment variable")
+    serve(address,
+          model_name=args.model_name,
+          encoder_name=args.encoder_name,
+          models_dir=args.models_dir,
+          max_batch_rows=args.max_batch_rows,
+          max_latency=args.max_latency_ms / 1000,
+          authkey=authkey.encode("utf-8") if authkey else None)
+
+
+if __name__ == "__main__":
+    main()
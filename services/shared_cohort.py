@@ -0,0 +1,85 @@
+"""
+Students cohort shared read-only by all the sessions of a host.
+
+The cohort is loaded from the memory-mapped cache of `data_ingestion`, so
+that its numeric and categorical code arrays live once in the host's page
+cache whatever the number of processes, and each process keeps a single
+`Cohort` whose frames are zero-copy views of those arrays. When the source
+file changes, the next `get` loads a new version while the sessions still
+using the previous one keep it alive; a version is released once no result
+or session references it anymore (tracked with weak references).
+"""
+
+import threading
+import weakref
+import pandas as pd
+from .data_ingestion import (NAME_COLUMNS, get_source_fingerprint,
+                             load_student_data)
+
+TARGET_COLUMN = "FinalGrade"
+
+
+class Cohort:
+    """Read-only version of the students data and its zero-copy views"""
+
+    def __init__(self, frame: pd.DataFrame, source_fingerprint):
+        self.frame = frame
+        self.source_fingerprint = source_fingerprint
+        feature_columns = [
+            column for column in frame.columns
+            if column not in NAME_COLUMNS and column != TARGET_COLUMN
+        ]
+        self.X = self.view(feature_columns)
+        self.y = frame[TARGET_COLUMN]
+        self.names = self.view(NAME_COLUMNS)
+
+    def view(self, columns):
+        """Frame of `columns` sharing the cohort arrays"""
+        return pd.DataFrame({column: self.frame[column]
+                             for column in columns},
+                            index=self.frame.index,
+                            copy=False)
+
+    def __len__(self):
+        return len(self.frame)
+
+
+class SharedCohortStore:
+    """Process-wide store of the current cohort version of `path`"""
+
+    def __init__(self, path, cache_dir=None):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.loads = 0
+        self._current = None
+        self._versions = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The current cohort, (re)loaded when the source file changed"""
+        source_fingerprint = get_source_fingerprint(self.path)
+        with self._lock:
+            if self._current is None or (self._current.source_fingerprint !=
+                                         source_fingerprint):
+                frame = load_student_data(self.path, cache_dir=self.cache_dir)
+                self._current = Cohort(frame, source_fingerprint)
+                self._versions[self.loads] = self._current
+                self.loads += 1
+            return self._current
+
+    def live_versions(self):
+        """Number of cohort versions still referenced"""
+        return len(self._versions)
+
+
+_stores = dict()
+_stores_lock = threading.Lock()
+
+
+def get_shared_cohort_store(path, cache_dir=None):
+    """Shared cohort store of `path` for the current process"""
+    with _stores_lock:
+        key = (path, cache_dir)
+        if key not in _stores:
+            _stores[key] = SharedCohortStore(path, cache_dir=cache_dir)
+        return _stores[key]
@@ -0,0 +1,316 @@
+"""
+Precomputed cohort-level aggregates of every sidebar strategy.
+
+The strategy space of `get_all_actionable_features` is finite (84 000
+combinations), so the cohort-level impact of each strategy is materialized
+once in a compact `.npz` cube: the mean and quantiles of the
+`PerformanceGain` and of the `Complexity`, and the share of students with a
+positive gain. The dashboard then reads any strategy's summary with an O(1)
+lookup.
+
+With a linear grading model, the gain and the complexity of a student are
+sums of per-feature terms, so the means are computed exactly over the whole
+cohort by broadcasting one vector per feature over the grid. Quantiles and
+positive shares need the per-student values: they are enumerated block by
+block over the grid, on a random sample of at most `max_students` students.
+Other models are scored on that sample with `predict_batch`.
+
+    python -m services.strategy_cube data/student_data.csv \\
+        --output .cache/strategy_cube.npz --max-students 10000
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from .baseline_grader_model import BaselineGraderModel
+from .data_ingestion import get_source_fingerprint
+from .optimal_improvement_strategy import (get_feature_options,
+                                           get_option_costs)
+from .result_cache import artifacts_version
+from .shared_cohort import get_shared_cohort_store
+from .utils import get_all_actionable_features
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CUBE_PATH = os.path.join(".cache", "strategy_cube.npz")
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+# maximal number of strategies enumerated at once per sampled student
+MAX_BLOCK_STRATEGIES = 1_000
+
+
+def _grid_sum(terms):
+    """
+    Sum over the grid of per-feature terms: `terms` holds one (..., n_f)
+    array per feature, the result has shape (..., n_1 × ... × n_F) in
+    C order of the features
+    """
+    total = terms[0]
+    for term in terms[1:]:
+        total = (total[..., :, None] + term[..., None, :]).reshape(
+            *total.shape[:-1], -1)
+    return total
+
+
+class StrategyCube:
+    """Cohort-level aggregates of every strategy of the sidebar grid"""
+
+    def __init__(self, features, options, arrays: dict, meta: dict):
+        self.features = list(features)
+        self.options = [list(feature_options) for feature_options in options]
+        self.arrays = arrays
+        self.meta = meta
+        self.shape = tuple(len(feature_options) for feature_options in options)
+        self._positions = [{
+            value: position
+            for position, value in enumerate(feature_options)
+        } for feature_options in self.options]
+
+    @classmethod
+    def compute(cls,
+                X: pd.DataFrame,
+                y: pd.Series,
+                inference_model=None,
+                actionable_features=None,
+                max_students=10_000,
+                quantiles=QUANTILES,
+                random_state=0):
+        """Precompute the aggregates of every strategy on the cohort `X`"""
+        if actionable_features is None:
+            actionable_features = get_all_actionable_features()
+        if inference_model is None:
+            inference_model = BaselineGraderModel(X)
+        grid_options = get_feature_options(actionable_features)
+        features = list(grid_options)
+        options = [grid_options[feature] for feature in features]
+        feature_types = [
+            actionable_features[feature]["type"] for feature in features
+        ]
+        n_students = len(X)
+        sample = np.arange(n_students)
+        if n_students > max_students:
+            sample = np.sort(
+                np.random.default_rng(random_state).choice(n_students,
+                                                           max_students,
+                                                           replace=False))
+        X_sample, y_sample = X.iloc[sample], y.to_numpy(dtype=float)[sample]
+        costs = [
+            get_option_costs(X_sample[feature].to_numpy(), feature_options,
+                             feature_type)
+            for feature, feature_options, feature_type in zip(
+                features, options, feature_types)
+        ]
+        n_leading = 0
+        while np.prod([len(feature_options) for feature_options in
+                       options[n_leading:]]) > MAX_BLOCK_STRATEGIES:
+            n_leading += 1
+
+        if inference_model.supports_delta_scoring:
+            base_gain = inference_model.predict_baseline(X) - y.to_numpy(
+                dtype=float)
+            gains, mean_gains, mean_costs = [], [], []
+            for feature, feature_options, feature_type in zip(
+                    features, options, feature_types):
+                option_contributions = inference_model.feature_contributions(
+                    feature, pd.Series(feature_options))
+                contributions = inference_model.feature_contributions(
+                    feature, X[feature])
+                gains.append(option_contributions[None, :] -
+                             contributions[sample, None])
+                # exact separable means over the whole cohort
+                mean_gains.append(option_contributions - contributions.mean())
+                mean_costs.append(
+                    get_option_costs(X[feature].to_numpy(), feature_options,
+                                     feature_type).mean(axis=0))
+            gain_mean = base_gain.mean() + _grid_sum(mean_gains)
+            complexity_mean = _grid_sum(mean_costs)
+            base_gain = base_gain[sample]
+            rest_gains = _grid_sum(gains[n_leading:])
+
+        rest_costs = _grid_sum(costs[n_leading:])
+        block_size = rest_costs.shape[1]
+        n_strategies = int(np.prod([len(o) for o in options]))
+        gain_quantiles = np.empty((n_strategies, len(quantiles)),
+                                  dtype=np.float32)
+        complexity_quantiles = np.empty_like(gain_quantiles)
+        positive_share = np.empty(n_strategies, dtype=np.float32)
+        sample_gain_mean = np.empty(n_strategies)
+        sample_complexity_mean = np.empty(n_strategies)
+        leading_grid = itertools.product(
+            *[range(len(feature_options)) for feature_options in
+              options[:n_leading]])
+        for block_idx, leading in enumerate(leading_grid):
+            leading_costs = sum(
+                (costs[feature_idx][:, position]
+                 for feature_idx, position in enumerate(leading)),
+                np.zeros(len(sample)))
+            if inference_model.supports_delta_scoring:
+                leading_gain = base_gain + sum(
+                    (gains[feature_idx][:, position]
+                     for feature_idx, position in enumerate(leading)),
+                    np.zeros(len(sample)))
+                block_gains = leading_gain[:, None] + rest_gains
+            else:
+                strategy_configs = [
+                    dict(
+                        zip(features, [
+                            options[feature_idx][position] for feature_idx,
+                            position in enumerate(leading + rest)
+                        ])) for rest in itertools.product(*[
+                            range(len(feature_options))
+                            for feature_options in options[n_leading:]
+                        ])
+                ]
+                block_gains = np.asarray(
+                    inference_model.predict_batch(
+                        X_sample, strategy_configs)).T - y_sample[:, None]
+            block_costs = leading_costs[:, None] + rest_costs
+            block = slice(block_idx * block_size,
+                          (block_idx + 1) * block_size)
+            gain_quantiles[block] = np.quantile(block_gains, quantiles,
+                                                axis=0).T
+            complexity_quantiles[block] = np.quantile(block_costs,
+                                                      quantiles,
+                                                      axis=0).T
+            positive_share[block] = (block_gains > 0).mean(axis=0)
+            sample_gain_mean[block] = block_gains.mean(axis=0)
+            sample_complexity_mean[block] = block_costs.mean(axis=0)
+            logger.info("strategy cube: %d/%d strategies",
+                        (block_idx + 1) * block_size, n_strategies)
+        if not inference_model.supports_delta_scoring:
+            gain_mean, complexity_mean = (sample_gain_mean,
+                                          sample_complexity_mean)
+
+        shape = tuple(len(feature_options) for feature_options in options)
+        arrays = {
+            "gain_mean":
+            np.asarray(gain_mean, dtype=np.float32).reshape(shape),
+            "complexity_mean":
+            np.asarray(complexity_mean, dtype=np.float32).reshape(shape),
+            "positive_share":
+            positive_share.reshape(shape),
+            "gain_quantiles":
+            gain_quantiles.reshape(*shape, len(quantiles)),
+            "complexity_quantiles":
+            complexity_quantiles.reshape(*shape, len(quantiles))
+        }
+        meta = {
+            "n_students": n_students,
+            "n_sampled": len(sample),
+            "quantiles": list(quantiles)
+        }
+        return cls(features, [feature_options.tolist()
+                              for feature_options in options], arrays, meta)
+
+    def save(self, path):
+        """Save the cube as a compressed `.npz` file"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta = dict(self.meta, features=self.features, options=self.options)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path,
+                            meta=np.array(json.dumps(meta, default=str)),
+                            **self.arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a cube saved with `save`"""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {key: data[key] for key in data.files if key != "meta"}
+        features, options = meta.pop("features"), meta.pop("options")
+        return cls(features, options, arrays, meta)
+
+    def is_current(self, source_fingerprint, model_version):
+        """Whether the cube was built from this data and model version"""
+        return self.meta.get("source") == source_fingerprint and self.meta.get(
+            "model_version") == model_version
+
+    def lookup(self, strategy_config: dict):
+        """
+        Aggregates of the strategy `strategy_config`, None when one of its
+        values is not in the grid
+        """
+        try:
+            position = tuple(
+                self._positions[feature_idx][strategy_config[feature]]
+                for feature_idx, feature in enumerate(self.features))
+        except KeyError:
+            return None
+        positive_share = float(self.arrays["positive_share"][position])
+        return {
+            "gain_mean":
+            float(self.arrays["gain_mean"][position]),
+            "complexity_mean":
+            float(self.arrays["complexity_mean"][position]),
+            "positive_share":
+            positive_share,
+            "positive_count":
+            int(round(positive_share * self.meta["n_students"])),
+            "gain_quantiles":
+            dict(
+                zip(self.meta["quantiles"],
+                    self.arrays["gain_quantiles"][position].tolist())),
+            "complexity_quantiles":
+            dict(
+                zip(self.meta["quantiles"],
+                    self.arrays["complexity_quantiles"][position].tolist()))
+        }
+
+
+def build_strategy_cube(data_path,
+                        output_path=DEFAULT_CUBE_PATH,
+                        model_name="grader-model-v1",
+                        encoder_name="grader-encoder-v1",
+                        max_students=10_000,
+                        random_state=0):
+    """Precompute and save the strategy cube of the students file"""
+    cohort = get_shared_cohort_store(data_path).get()
+    inference_model = BaselineGraderModel(cohort.X,
+                                          model_name=model_name,
+                                          encoder_name=encoder_name)
+    cube = StrategyCube.compute(cohort.X,
+                                cohort.y,
+                                inference_model=inference_model,
+                                max_students=max_students,
+                                random_state=random_state)
+    cube.meta.update(source=get_source_fingerprint(data_path),
+                     model_version=artifacts_version(
+                         [model_name, encoder_name]))
+    cube.save(output_path)
+    return cube
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m services.strategy_cube",
+        description="Precompute the cohort-level aggregates of every "
+        "sidebar strategy")
+    parser.add_argument("input", help="students CSV file")
+    parser.add_argument("--output", default=DEFAULT_CUBE_PATH)
+    parser.add_argument("--model-name", default="grader-model-v1")
+    parser.add_argument("--encoder-name", default="grader-encoder-v1")
+    parser.add_argument("--max-students",
+                        type=int,
+                        default=10_000,
+                        help="students sampled for the quantiles")
+    parser.add_argument("--random-state", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    if not os.path.exists(args.input):
+        parser.error(f"input file not found: {args.input}")
+    build_strategy_cube(args.input,
+                        output_path=args.output,
+                        model_name=args.model_name,
+                        encoder_name=args.encoder_name,
+                        max_students=args.max_students,
+                        random_state=args.random_state)
+
+
+if __name__ == "__main__":
+    main()
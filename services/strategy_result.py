@@ -0,0 +1,142 @@
+"""
+Compact improvement strategy results.
+
+A strategy's `X_target` holds the whole students frame again plus its wide
+auxiliary columns. A `StrategyResult` only owns the computed columns, the
+improvement levels as int8, the complexity as int16 (or a wider integer type
+when their values do not fit) and the grades as float32, and shares the
+input students frame (and any extra display columns) read-only. Columns are
+resolved on access as views, the full `X_target` frame being only
+materialized on demand for compatibility.
+"""
+
+import numpy as np
+import pandas as pd
+
+IMPLEVEL_SUFFIX = "_implevel"
+MEASURE_DTYPES = {
+    "ExpectedGrade": np.float32,
+    "PerformanceGain": np.float32,
+    "Complexity": np.int16
+}
+
+INTEGER_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _to_compact_numpy(values: pd.Series, dtype):
+    """
+    Values as `dtype`, or as the narrowest wider integer type holding them
+    when they are out of the range of the integer `dtype`
+    """
+    if not np.issubdtype(dtype, np.integer) or values.empty:
+        return values.to_numpy(dtype=dtype)
+    low, high = values.min(), values.max()
+    for candidate in INTEGER_DTYPES[INTEGER_DTYPES.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return values.to_numpy(dtype=candidate)
+    return values.to_numpy(dtype=np.int64)
+
+
+class StrategyResult:
+    """Read-only result of an applied improvement strategy"""
+
+    def __init__(self,
+                 X: pd.DataFrame,
+                 y: pd.Series,
+                 strategy_config: dict,
+                 implevels: pd.DataFrame,
+                 measures: pd.DataFrame,
+                 extra: pd.DataFrame = None,
+                 strategy_name=None):
+        self.X = X
+        self.y = y
+        self.strategy_config = strategy_config
+        self.strategy_name = strategy_name
+        self.implevels = implevels
+        self.measures = measures
+        # shared display columns, e.g. the students names
+        self.extra = extra if extra is not None else pd.DataFrame(
+            index=X.index)
+
+    @classmethod
+    def from_strategy(cls, estimator, extra: pd.DataFrame = None):
+        """Compact result of a strategy whose `X_target` was computed"""
+        X_target = estimator.X_target
+        implevels = pd.DataFrame(
+            {
+                column: _to_compact_numpy(X_target[column], np.int8)
+                for column in X_target.columns
+                if column.endswith(IMPLEVEL_SUFFIX)
+            },
+            index=X_target.index)
+        measures = pd.DataFrame(
+            {
+                column: _to_compact_numpy(X_target[column], dtype)
+                for column, dtype in MEASURE_DTYPES.items()
+            },
+            index=X_target.index)
+        return cls(estimator.X,
+                   estimator.y,
+                   estimator.strategy_config,
+                   implevels,
+                   measures,
+                   extra=extra,
+                   strategy_name=estimator.strategy_name)
+
+    @property
+    def columns(self):
+        """Columns of the equivalent `X_target` frame"""
+        columns = list(self.X.columns) + list(self.implevels.columns) + list(
+            self.measures.columns) + list(self.extra.columns)
+        if self.y is not None and self.y.name not in columns:
+            columns.append(self.y.name)
+        return columns
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __len__(self):
+        return len(self.X)
+
+    def __getitem__(self, column):
+        """Column (as a Series) or columns (as a DataFrame) of the result"""
+        if isinstance(column, list):
+            return self.frame(column)
+        for frame in (self.measures, self.implevels, self.extra):
+            if column in frame:
+                return frame[column]
+        if column in self.strategy_config:
+            target_value = self.strategy_config[column]
+            if isinstance(target_value, pd.Series):
+                return target_value.rename(column)
+            return pd.Series(target_value, index=self.X.index, name=column)
+        if column in self.X:
+            return self.X[column]
+        if self.y is not None and column == self.y.name:
+            return self.y
+        raise KeyError(column)
+
+    def frame(self, columns, reset_index=False):
+        """Frame of `columns`, sharing the result's arrays"""
+        frame = pd.DataFrame({column: self[column]
+                              for column in columns},
+                             index=self.X.index,
+                             copy=False)
+        if reset_index:
+            index = self.X.index
+            frame.index = pd.RangeIndex(len(frame))
+            frame.insert(0, index.name or "index", index.to_numpy())
+        return frame
+
+    @property
+    def X_target(self):
+        """Full students frame after the strategy, materialized on access"""
+        return self.frame(self.columns)
+
+    @property
+    def nbytes(self):
+        """Memory owned by the result, the shared input columns excluded"""
+        return int(
+            self.implevels.memory_usage(index=False).sum() +
+            self.measures.memory_usage(index=False).sum())
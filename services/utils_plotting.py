@@ -1,10 +1,41 @@
 """Utils plotting"""
 
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
+from .strategy_result import StrategyResult
+
+# above this number of points, figures switch to the large-N rendering mode:
+# WebGL traces on downsampled points for interactive figures and hexbin
+# density tiles for static ones
+LARGE_N_THRESHOLD = 10_000
+# maximal number of points drawn in the large-N rendering mode
+MAX_DISPLAY_POINTS = 5_000
+
+
+def downsample_positions(x, y, max_points=MAX_DISPLAY_POINTS, random_state=0):
+    """
+    Positions of at most `max_points` points to display. The points that
+    matter for prioritization, with the highest `x` (gain) and the lowest `y`
+    (complexity), are always kept and the rest is uniformly sampled.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    n_extremes = max_points // 4
+    extremes = np.union1d(
+        np.argpartition(-x, n_extremes)[:n_extremes],
+        np.argpartition(y, n_extremes)[:n_extremes])
+    others = np.setdiff1d(np.arange(len(x)), extremes, assume_unique=True)
+    rng = np.random.default_rng(random_state)
+    sampled = rng.choice(others,
+                         size=max_points - len(extremes),
+                         replace=False)
+    return np.sort(np.concatenate([extremes, sampled]))
 
 
 def scatter_plot(x, y, option="static", xlabel=None, ylabel=None, **kwargs):
@@ -22,15 +53,21 @@ def scatter_plot(x, y, option="static", xlabel=None, ylabel=None, **kwargs):
 def plotly_scatter_plot(x, y, xlabel=None, ylabel=None, **kwargs):
     """Plot a scatter plot using plotly modules"""
     width, height = kwargs.pop("width", 10), kwargs.pop("height", 6)
+    large_n_threshold = kwargs.pop("large_n_threshold", LARGE_N_THRESHOLD)
     color = kwargs.pop("color")
     xlabel = xlabel if xlabel else x.name
     ylabel = ylabel if ylabel else y.name
+    scatter_trace = go.Scatter
+    if len(x) > large_n_threshold:
+        positions = downsample_positions(x, y)
+        x, y = x.iloc[positions], y.iloc[positions]
+        scatter_trace = go.Scattergl
     fig = go.FigureWidget([
-        go.Scatter(x=x,
-                   y=y,
-                   mode='markers',
-                   opacity=0.65,
-                   marker=dict(color=color))
+        scatter_trace(x=x,
+                      y=y,
+                      mode='markers',
+                      opacity=0.65,
+                      marker=dict(color=color))
     ])
     fig.update_layout(width=width * 96,
                       height=height * 96,
@@ -44,9 +81,17 @@ def plotly_scatter_plot(x, y, xlabel=None, ylabel=None, **kwargs):
 def matplotlib_scatter_plot(x, y, xlabel=None, ylabel=None, **kwargs):
     """Plot a scatter plot using matplotlib modules"""
     width, height = kwargs.pop("width", 10), kwargs.pop("height", 6)
+    large_n_threshold = kwargs.pop("large_n_threshold", LARGE_N_THRESHOLD)
     setup_rc_params()
     fig, axis = plt.subplots(figsize=(width, height))
-    axis.scatter(x, y, s=15, **kwargs)
+    if len(x) > large_n_threshold:
+        color = kwargs.pop("color", "tab:blue")
+        cmap = mpl.colors.LinearSegmentedColormap.from_list(
+            "density", ["white", color])
+        tiles = axis.hexbin(x, y, gridsize=60, mincnt=1, cmap=cmap, bins="log")
+        fig.colorbar(tiles, ax=axis, label="Number of students")
+    else:
+        axis.scatter(x, y, s=15, **kwargs)
     xlabel = xlabel if xlabel else x.name
     ylabel = ylabel if ylabel else y.name
     axis.set_xlabel(xlabel)
@@ -65,40 +110,64 @@ def priority_scatter_plot(estimator, y, option, **kwargs):
     """Scatter"""
     assert option in ("static", "interactive")
     width, height = kwargs.pop("width", 10), kwargs.pop("height", 6)
-    estimator.X_target[
-        "PositiveGain"] = estimator.X_target["PerformanceGain"] > 0
-    estimator.X_target["20-FinalGrade"] = 20 - y
+    large_n_threshold = kwargs.pop("large_n_threshold", LARGE_N_THRESHOLD)
+    # compact strategy results resolve columns without building X_target
+    source = estimator if isinstance(estimator,
+                                     StrategyResult) else estimator.X_target
+    hover_data = [
+        column for column in ("FirstName", "FamilyName", "FinalGrade",
+                              "ExpectedGrade", "PerformanceGain", "Complexity")
+        if column in source
+    ]
+    # only the plotted columns are sent to the figures
+    plot_frame = pd.DataFrame(
+        {column: source[column]
+         for column in hover_data})
+    plot_frame["20-FinalGrade"] = 20 - y
+    large_n = len(plot_frame) > large_n_threshold
     if option == "static":
         fig, axis = plt.subplots(figsize=(width, height))
+        if large_n:
+            tiles = axis.hexbin(plot_frame["PerformanceGain"],
+                                plot_frame["Complexity"],
+                                C=plot_frame["20-FinalGrade"],
+                                reduce_C_function=np.mean,
+                                gridsize=60,
+                                mincnt=1)
+            fig.colorbar(tiles,
+                         ax=axis,
+                         label="Mean points to maximal grade (20-FinalGrade)")
+            axis.set_xlabel("PerformanceGain")
+            axis.set_ylabel("Complexity")
+            return fig
         axis.plot([], [],
                   '',
                   color='black',
                   label="Points to maximal grade (20-FinalGrade)")
-        sns.scatterplot(data=estimator.X_target,
+        sns.scatterplot(data=plot_frame,
                         x="PerformanceGain",
                         y="Complexity",
                         hue="20-FinalGrade",
                         size="20-FinalGrade",
                         legend="full",
                         ax=axis)
-        custom_legend_columns = estimator.X_target["20-FinalGrade"].nunique(
-        ) // 3
+        custom_legend_columns = plot_frame["20-FinalGrade"].nunique() // 3
         axis.legend(bbox_to_anchor=(0, 1.02, 1, 0.2),
                     loc="lower left",
                     mode="expand",
                     borderaxespad=0,
                     ncol=custom_legend_columns)
         return fig
-    hover_data = [
-        "FirstName", "FamilyName", "FinalGrade", "ExpectedGrade",
-        "PerformanceGain", "Complexity"
-    ]
-    fig = px.scatter(estimator.X_target,
+    if large_n:
+        plot_frame = plot_frame.iloc[downsample_positions(
+            plot_frame["PerformanceGain"], plot_frame["Complexity"])]
+    fig = px.scatter(plot_frame,
                      x="PerformanceGain",
                      y="Complexity",
                      color="20-FinalGrade",
                      size='20-FinalGrade',
-                     hover_data=hover_data)
+                     hover_data=hover_data,
+                     render_mode="webgl" if large_n else "auto")
     fig.update_layout(
         width=width * 96,  # inches to pixels
         height=height * 96,
@@ -0,0 +1,209 @@
+"""Util view components, these helpers depend on `streamlit`"""
+
+import pandas as pd
+import streamlit as st
+from .export import EXPORT_FORMATS, serialize_frame
+from .instrumentation import span
+from .prioritization import PRIORITY_CRITERIA, PrioritizationIndex
+from .range_index import MeasureRangeIndex
+
+
+def adjust_page_ui_settings():
+    """Setup page UI settings"""
+    st.set_page_config(layout="wide",
+                       page_title="Student Monitoring Platform",
+                       page_icon="assets/favicon.png")
+    st.markdown(
+        '''<style>
+            .css-1vq4p4l {padding-top: 2.5rem;}
+         </style>
+        ''',
+        unsafe_allow_html=True,
+    )
+
+
+def add_title(title, color="black", size="1.5rem", background_color=None):
+    """Add customed title"""
+    style = f"text-align: center; color: {color}; font-size: {size}; "
+    if background_color:
+        style += f"background-color: {background_color}"
+    return st.markdown(f"<h1 style='{style}'>{title}</h1>",
+                       unsafe_allow_html=True)
+
+
+def filter_and_export_component(estimator,
+                                display_frame,
+                                filter_features,
+                                start_int_key: int,
+                                ascending=True,
+                                range_index: MeasureRangeIndex = None,
+                                export_cache=None,
+                                cache_key=None):
+    """
+    Constructs the view component for filtering and exporting the 
+    students data given `filter_features`. A `range_index` built once over
+    `display_frame` can be shared by several components, and the exports
+    of the strategy result `cache_key` are kept in `export_cache`.
+    """
+    if range_index is None:
+        range_index = MeasureRangeIndex(display_frame, filter_features)
+    holder_dict = dict()
+    key = start_int_key
+    for feature in filter_features:
+        holder_dict[feature] = dict()
+        feature_min, feature_max = range_index.bounds(feature)
+        holder_dict[feature]["min"] = int(feature_min)
+        holder_dict[feature]["max"] = int(feature_max + 1)
+
+        holder_dict[feature]["values"] = st.slider(
+            f"Select range of {feature}:",
+            holder_dict[feature]["min"],
+            holder_dict[feature]["max"],
+            (holder_dict[feature]["min"], holder_dict[feature]["max"]),
+            key=key)
+        key += 1
+
+    # Adding a sorting option would be better for later versions
+    with span("filter", rows=len(display_frame)):
+        filtred_df = range_index.query(
+            {
+                feature: value["values"]
+                for (feature, value) in holder_dict.items()
+            },
+            sort_by=filter_features[0],
+            ascending=ascending)
+    filename = "range_students_with_" + "_".join(([
+        f"{feature}={value['values']}"
+        for (feature, value) in holder_dict.items()
+    ]))
+
+    st.dataframe(filtred_df)
+    export_component(filtred_df,
+                     filename,
+                     label="Download range student data",
+                     key=key,
+                     export_cache=export_cache,
+                     cache_key=(cache_key, filename))
+
+
+def prioritization_component(priority_index: PrioritizationIndex,
+                             start_int_key: int,
+                             export_cache=None,
+                             cache_key=None):
+    """
+    Constructs the view component listing and exporting the shortlist of
+    the students to prioritize: the (gain, complexity) Pareto front or the
+    top-K students under a priority criterion
+    """
+    key = start_int_key
+    shortlist_type = st.radio("Shortlist",
+                              ("Pareto front", "Top-K"),
+                              horizontal=True,
+                              key=key)
+    if shortlist_type == "Pareto front":
+        st.markdown("Students for whom no other student offers a higher "
+                    "performance gain for a lower or equal complexity.")
+        with span("prioritization.pareto_front", rows=len(priority_index)):
+            shortlist = priority_index.pareto_front()
+        filename = "pareto_front_students"
+    else:
+        criterion = st.selectbox("Priority criterion",
+                                 list(PRIORITY_CRITERIA),
+                                 format_func=PRIORITY_CRITERIA.get,
+                                 key=key + 1)
+        top_k = st.number_input("Number of students",
+                                min_value=1,
+                                max_value=max(len(priority_index), 1),
+                                value=min(50, max(len(priority_index), 1)),
+                                key=key + 2)
+        complexity_weight = 1.
+        if criterion == "weighted":
+            complexity_weight = st.slider("Complexity weight",
+                                          0.,
+                                          5.,
+                                          1.,
+                                          step=0.1,
+                                          key=key + 3)
+        with span("prioritization.top_k", rows=len(priority_index)):
+            shortlist = priority_index.top_k(
+                top_k,
+                criterion=criterion,
+                complexity_weight=complexity_weight)
+        filename = f"top_{top_k}_students_by_{criterion}"
+        if criterion == "weighted":
+            filename += f"_{complexity_weight}"
+    st.dataframe(shortlist)
+    export_component(shortlist,
+                     filename,
+                     label="Download shortlisted student data",
+                     key=key + 4,
+                     export_cache=export_cache,
+                     cache_key=(cache_key, filename))
+
+
+def strategy_cube_component(cube, strategy_config):
+    """
+    Constructs the cohort-level preview of `strategy_config` read from the
+    precomputed strategy `cube` (None when it is not available)
+    """
+    summary = cube.lookup(strategy_config) if cube is not None else None
+    if summary is None:
+        st.caption("No precomputed preview for this dataset and model, run "
+                   "`python -m services.strategy_cube` to build it.")
+        return
+    left, right = st.columns(2)
+    left.metric("Mean gain", f"{summary['gain_mean']:.2f}")
+    right.metric("Median gain", f"{summary['gain_quantiles'][0.5]:.2f}")
+    left.metric(
+        "Positive gain",
+        f"{summary['positive_count']} ({summary['positive_share']:.0%})")
+    right.metric("Mean complexity", f"{summary['complexity_mean']:.1f}")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "PerformanceGain": summary["gain_quantiles"],
+                "Complexity": summary["complexity_quantiles"]
+            }).rename(index=lambda quantile: f"p{quantile * 100:g}"))
+    if cube.meta["n_sampled"] < cube.meta["n_students"]:
+        st.caption(f"Quantiles and positive gain estimated on "
+                   f"{cube.meta['n_sampled']} sampled students.")
+
+
+def export_component(frame,
+                     filename,
+                     label,
+                     key,
+                     export_cache=None,
+                     cache_key=None):
+    """
+    Constructs the view component exporting `frame` (or the frame returned
+    by the `frame` function). The data is only serialized once the user asks
+    for it and, given an `export_cache`, the serialized bytes are reused for
+    the same `cache_key` and format.
+    """
+    export_format = st.selectbox("Export format",
+                                 list(EXPORT_FORMATS),
+                                 key=f"export-format-{key}")
+    if not st.button(f"Prepare {export_format} export",
+                     key=f"export-prepare-{key}"):
+        return
+
+    def serialize():
+        return serialize_frame(frame() if callable(frame) else frame,
+                               export_format)
+
+    try:
+        if export_cache is None or cache_key is None:
+            data = serialize()
+        else:
+            data = export_cache.get_or_compute((cache_key, export_format),
+                                               serialize)
+    except ImportError as error:
+        st.error(str(error))
+        return
+    st.download_button(
+        label=f"{label} ({export_format})",
+        data=data,
+        file_name=f"{filename}.{EXPORT_FORMATS[export_format]['extension']}",
+        mime=EXPORT_FORMATS[export_format]["mime"],
+        key=f"export-download-{key}")
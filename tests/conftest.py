@@ -0,0 +1,14 @@
+"""Shared test setup: the model artifacts paths are relative to the repo"""
+
+import os
+import sys
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_root_cwd(monkeypatch):
+    """Run every test from the repository root"""
+    monkeypatch.chdir(REPO_ROOT)
@@ -0,0 +1,20 @@
+"""Baseline grades of a grading model shared by several threads"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from services.baseline_grader_model import BaselineGraderModel
+
+
+def test_shared_baseline_cache():
+    students = pd.read_csv(os.path.join("data", "student_data.csv"),
+                           index_col="StudentID")
+    X = students.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+    subsets = [X.iloc[:stop] for stop in (50, 120, 200, 357)] * 25
+    model = BaselineGraderModel(X)
+    expected = {len(subset): model.predict(subset) for subset in subsets}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        grades = list(executor.map(model.predict_baseline, subsets))
+    for subset, subset_grades in zip(subsets, grades):
+        assert np.allclose(subset_grades, expected[len(subset)])
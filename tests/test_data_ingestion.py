@@ -0,0 +1,42 @@
+"""The students data cache must be safe to build from several processes"""
+
+import multiprocessing
+import os
+import shutil
+from services.data_ingestion import get_source_fingerprint, load_student_data
+
+N_PROCESSES = 8
+
+
+def load_length(args):
+    """Number of students loaded, run in a worker process"""
+    path, cache_dir = args
+    return len(load_student_data(path, cache_dir=cache_dir))
+
+
+def test_concurrent_rebuilds(tmp_path):
+    path = str(tmp_path / "student_data.csv")
+    cache_dir = str(tmp_path / "cache")
+    shutil.copy(os.path.join("data", "student_data.csv"), path)
+    with multiprocessing.get_context("spawn").Pool(N_PROCESSES) as pool:
+        lengths = pool.map(load_length, [(path, cache_dir)] * N_PROCESSES)
+    assert len(set(lengths)) == 1
+    # a single published version and no leftover temporary directory
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_rebuild_on_source_change(tmp_path):
+    path = str(tmp_path / "student_data.csv")
+    cache_dir = str(tmp_path / "cache")
+    shutil.copy(os.path.join("data", "student_data.csv"), path)
+    frame = load_student_data(path, cache_dir=cache_dir)
+    with open(path, encoding="utf-8") as file:
+        last_line = file.read().splitlines()[-1]
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(last_line + "\n")
+    fingerprint = get_source_fingerprint(path)
+    os.utime(path, ns=(fingerprint["mtime_ns"], fingerprint["mtime_ns"] + 1))
+    assert len(load_student_data(path, cache_dir=cache_dir)) == len(frame) + 1
+    assert len(os.listdir(cache_dir)) == 1
+    # memory maps of the pruned version stay readable
+    assert len(frame.to_numpy()) == len(frame)
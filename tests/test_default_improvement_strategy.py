@@ -0,0 +1,86 @@
+"""Regression tests of the vectorized default improvement strategy"""
+
+import pandas as pd
+import pytest
+from services.default_improvement_strategy import DefaultImprovementStrategy
+
+STRATEGY_CONFIGS = [
+    None, {
+        "studytime": 2,
+        "absences": 5,
+        "Dalc": 3,
+        "Walc": 2,
+        "freetime": 1,
+        "schoolsup": "no",
+        "famsup": "yes",
+        "paid": "no"
+    }, {
+        "studytime": 1,
+        "absences": 20,
+        "Dalc": 5,
+        "Walc": 5,
+        "freetime": 3,
+        "schoolsup": "no",
+        "famsup": "no",
+        "paid": "yes"
+    }, {
+        "studytime": 3,
+        "paid": "no"
+    }
+]
+
+
+def legacy_apply_improvement_strategy(estimator):
+    """Original per-student loop, kept as the reference implementation"""
+    student_improvement_data = {
+        key: []
+        for key in estimator.actionable_features
+    }
+    for student_id in estimator.X.index:
+        for feature, target_value in estimator.strategy_config.items():
+            current_value = estimator.X_target.loc[student_id][feature]
+            if feature in estimator.metadata["binary"]:
+                student_improvement_data[feature].append(
+                    1 if current_value != target_value else 0)
+            elif feature in estimator.metadata["numeric"]:
+                student_improvement_data[feature].append(
+                    abs(current_value - target_value
+                        ) if current_value != target_value else 0)
+            estimator.X_target.at[student_id, feature] = target_value
+    for feature, values in student_improvement_data.items():
+        estimator.X_target[f"{feature}_implevel"] = values
+    estimator.X_target["ExpectedGrade"] = estimator.inference_model.predict(
+        estimator.X_target)
+    estimator.setup_performance_gain()
+    estimator.setup_heuristic_complexity()
+
+
+@pytest.fixture(scope="module")
+def student_data():
+    return pd.read_csv("data/student_data.csv", index_col="StudentID")
+
+
+@pytest.mark.parametrize("n_students", [10, 357, 2000])
+@pytest.mark.parametrize("strategy_config", STRATEGY_CONFIGS)
+def test_matches_legacy_loop(student_data, n_students, strategy_config):
+    data = student_data.sample(n_students,
+                               replace=n_students > len(student_data),
+                               random_state=n_students).reset_index(drop=True)
+    data.index.name = "StudentID"
+    X = data.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+    y = data["FinalGrade"]
+
+    expected = DefaultImprovementStrategy(X,
+                                          y,
+                                          strategy_config=strategy_config)
+    legacy_apply_improvement_strategy(expected)
+    estimator = DefaultImprovementStrategy(X,
+                                           y,
+                                           strategy_config=strategy_config)
+    estimator.apply_improvement_strategy()
+
+    pd.testing.assert_frame_equal(
+        estimator.X_target[expected.X_target.columns],
+        expected.X_target,
+        check_dtype=False,
+        atol=1e-9)
@@ -0,0 +1,78 @@
+"""Incremental rescoring store keys and student matching"""
+
+import os
+import pandas as pd
+import pytest
+from services.data_ingestion import load_student_data
+from services.default_improvement_strategy import DefaultImprovementStrategy
+from services.incremental_scoring import (IncrementalImprovementStrategy,
+                                          IncrementalResultStore)
+
+
+def test_duplicate_student_ids(tmp_path):
+    students = pd.read_csv(os.path.join("data", "student_data.csv"),
+                           index_col="StudentID").iloc[:10]
+    students = pd.concat([students, students.iloc[:2]])
+    X = students.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+    with pytest.raises(ValueError, match="unique student ids"):
+        IncrementalImprovementStrategy(X,
+                                       students["FinalGrade"],
+                                       store_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize("changed", [{
+    "encoder_version": "encoder-v2"
+}, {
+    "dataset": "other_students.csv"
+}, {
+    "model_version": "model-v2"
+}])
+def test_store_key(changed):
+    versions = {
+        "model_version": "model-v1",
+        "encoder_version": "encoder-v1",
+        "dataset": "student_data.csv"
+    }
+    key = IncrementalResultStore(strategy_config={}, **versions).key
+    versions.update(changed)
+    assert IncrementalResultStore(strategy_config={}, **versions).key != key
+
+
+def test_incremental_matches_full_scoring(tmp_path):
+    path = os.path.join("data", "student_data.csv")
+    # the first run on the compact cache dtypes (categorical, int8), the
+    # second on the plain CSV dtypes (object, int64)
+    compact = load_student_data(path, cache_dir=str(tmp_path / "cache"))
+    students = pd.read_csv(path, index_col="StudentID")
+    students.loc[students.index[0], "absences"] += 1
+    new_student = students.iloc[[-1]].rename(
+        index={students.index[-1]: students.index.max() + 1})
+    students = pd.concat([students, new_student])
+    name_columns = ["FinalGrade", "FirstName", "FamilyName"]
+    strategy_config = {"Dalc": 1, "studytime": 4}
+
+    first = IncrementalImprovementStrategy(compact.drop(name_columns, axis=1),
+                                           compact["FinalGrade"],
+                                           strategy_config=strategy_config,
+                                           store_dir=str(tmp_path / "store"))
+    first.apply_improvement_strategy()
+    assert first.n_rescored == len(compact)
+    X, y = students.drop(name_columns, axis=1), students["FinalGrade"]
+    second = IncrementalImprovementStrategy(X,
+                                            y,
+                                            strategy_config=strategy_config,
+                                            store_dir=str(tmp_path / "store"))
+    second.apply_improvement_strategy()
+    assert second.n_rescored == 2
+    assert second.n_reused == len(students) - 2
+
+    full = DefaultImprovementStrategy(X, y, strategy_config=strategy_config)
+    full.apply_improvement_strategy()
+    columns = [column for column in full.X_target.columns
+               if column.endswith("_implevel")] + [
+                   "ExpectedGrade", "PerformanceGain", "Complexity"
+               ]
+    pd.testing.assert_frame_equal(second.X_target[columns],
+                                  full.X_target[columns],
+                                  check_dtype=False,
+                                  atol=1e-9)
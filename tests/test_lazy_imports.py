@@ -0,0 +1,53 @@
+"""The scoring core must not import the plotting and view dependencies"""
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("streamlit", "matplotlib", "seaborn", "plotly")
+# generous bound, the core imports numpy, pandas and scikit-learn only
+MAX_IMPORT_SECONDS = 10.
+
+CHECK_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from services import DefaultImprovementStrategy
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "modules": sorted(sys.modules)
+}))
+"""
+
+
+def run_core_import():
+    """Import the scoring core in a fresh interpreter"""
+    output = subprocess.run([sys.executable, "-c", CHECK_SCRIPT],
+                            capture_output=True,
+                            text=True,
+                            check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_core_import_skips_view_dependencies():
+    report = run_core_import()
+    loaded_heavy_modules = [
+        module for module in report["modules"]
+        if module.split(".")[0] in HEAVY_MODULES
+    ]
+    assert loaded_heavy_modules == []
+
+
+def test_core_import_time():
+    report = run_core_import()
+    assert report["seconds"] < MAX_IMPORT_SECONDS
+
+
+def test_view_helpers_stay_available():
+    output = subprocess.run([
+        sys.executable, "-c",
+        "import services; print(services.scatter_plot.__module__)"
+    ],
+                            capture_output=True,
+                            text=True,
+                            check=True).stdout
+    assert output.strip() == "services.utils_plotting"
@@ -0,0 +1,78 @@
+"""The scoring service must survive server restarts and malformed requests"""
+
+import os
+import stat
+import numpy as np
+import pandas as pd
+import pytest
+from multiprocessing.connection import Client
+from services.baseline_grader_model import BaselineGraderModel
+from services.scoring_service import (ScoringServer, ScoringServiceClient,
+                                      check_socket_owner, get_default_address,
+                                      start_local_server)
+
+
+@pytest.fixture(scope="module")
+def X():
+    students = pd.read_csv(os.path.join("data", "student_data.csv"),
+                           index_col="StudentID")
+    return students.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+
+
+def test_retry_after_server_restart(tmp_path, X):
+    address = str(tmp_path / "scoring.sock")
+    expected = BaselineGraderModel(X).predict(X)
+    client = ScoringServiceClient(address=address, pool_size=2)
+    process = start_local_server(address)
+    try:
+        assert np.allclose(client.predict(X), expected)
+        process.terminate()
+        process.join()
+        process = start_local_server(address)
+        # the pooled connection to the previous server is stale
+        assert np.allclose(client.predict(X), expected)
+    finally:
+        client.close()
+        process.terminate()
+
+
+def test_malformed_requests(tmp_path, X):
+    address = str(tmp_path / "scoring.sock")
+    client = ScoringServiceClient(address=address, pool_size=1, timeout=30.)
+    process = start_local_server(address)
+    try:
+        with Client(address) as connection:
+            for message in [("predict", None), ("predict", [1, 2]),
+                            "predict", ("predict", X.drop(columns="age"))]:
+                connection.send(message)
+                assert connection.recv()[0] == "error"
+        # the batcher is still alive
+        assert len(client.predict(X)) == len(X)
+    finally:
+        client.close()
+        process.terminate()
+
+
+def test_tcp_requires_authkey():
+    with pytest.raises(ValueError):
+        ScoringServer(("127.0.0.1", 0))
+
+
+def test_private_default_address(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    address = get_default_address()
+    assert stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode) == 0o700
+    # a directory shared with other users is refused
+    os.chmod(os.path.dirname(address), 0o777)
+    with pytest.raises(PermissionError):
+        get_default_address()
+
+
+def test_socket_owner_only(tmp_path, X):
+    address = str(tmp_path / "scoring.sock")
+    process = start_local_server(address)
+    try:
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+        check_socket_owner(address)
+    finally:
+        process.terminate()
@@ -0,0 +1,23 @@
+"""Compact strategy results must hold the strategy's exact values"""
+
+import os
+import numpy as np
+import pandas as pd
+from services.default_improvement_strategy import DefaultImprovementStrategy
+from services.strategy_result import StrategyResult
+
+
+def test_out_of_range_values():
+    students = pd.read_csv(os.path.join("data", "student_data.csv"),
+                           index_col="StudentID")
+    X = students.drop(["FinalGrade", "FirstName", "FamilyName"], axis=1)
+    # improvement levels beyond int8 and complexities beyond int16
+    X["absences"] = np.arange(len(X)) * 100
+    estimator = DefaultImprovementStrategy(X, students["FinalGrade"])
+    estimator.apply_improvement_strategy()
+    result = StrategyResult.from_strategy(estimator)
+    for column in ["absences_implevel", "Complexity"]:
+        assert result[column].max() > np.iinfo(np.int16).max
+        assert np.array_equal(result[column].to_numpy(),
+                              estimator.X_target[column].to_numpy())
+    assert result["Complexity"].dtype == np.int32
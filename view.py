@@ -1,12 +1,147 @@
 """View main page"""
 
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
 import streamlit as st
 import pandas as pd
 from services import *
 
+logger = logging.getLogger(__name__)
+
+DATA_PATH = "data/student_data.csv"
+MODEL_NAME, ENCODER_NAME = "grader-model-v1", "grader-encoder-v1"
+# optional scoring service socket, see `services.scoring_service`
+SCORING_SERVICE_ADDRESS = os.environ.get("COUNSELING_SCORING_SERVICE")
+SCORING_SERVICE_AUTHKEY = os.environ.get("COUNSELING_SCORING_AUTHKEY")
+# cohort-level aggregates of every strategy, see `services.strategy_cube`
+CUBE_PATH = DEFAULT_CUBE_PATH
+
 # ignore chained_assignment warning
 pd.options.mode.chained_assignment = None
 adjust_page_ui_settings()
+# per-stage timings of this rerun, see `services.instrumentation`
+start_run()
+# load the grading model artifacts once per process
+get_model_registry().warm_up([MODEL_NAME, ENCODER_NAME])
+
+
+@st.experimental_singleton
+def get_strategy_result_cache():
+    """Strategy results cache shared by all the sessions"""
+    return StrategyResultCache(max_entries=32, max_bytes=512 * 2**20)
+
+
+@st.experimental_singleton
+def get_export_cache():
+    """Serialized exports cache shared by all the sessions"""
+    return StrategyResultCache(max_entries=64, max_bytes=256 * 2**20)
+
+
+@st.experimental_singleton
+def get_strategy_executor():
+    """Worker threads evaluating the strategies of all the sessions"""
+    return ThreadPoolExecutor(max_workers=4,
+                              thread_name_prefix="strategy-worker")
+
+
+def get_strategy_runner():
+    """Debounced background strategy runner of the current session"""
+    strategy_runner = st.session_state.get("strategy_runner")
+    if strategy_runner is None:
+        strategy_runner = DebouncedRunner(get_strategy_executor(),
+                                          debounce_seconds=0.3)
+        st.session_state["strategy_runner"] = strategy_runner
+    return strategy_runner
+
+
+@st.experimental_singleton
+def get_scoring_client():
+    """Pooled scoring service client shared by all the sessions"""
+    return ScoringServiceClient(
+        address=SCORING_SERVICE_ADDRESS,
+        authkey=SCORING_SERVICE_AUTHKEY.encode("utf-8")
+        if SCORING_SERVICE_AUTHKEY else None,
+        pool_size=8)
+
+
+@st.experimental_singleton
+def get_baseline_model(model_version):
+    """
+    Grading model shared by all the strategies and sessions, so that the
+    baseline grades of the current cohort are only inferred once, reloaded
+    with a new model or encoder version
+    """
+    return BaselineGraderModel(get_shared_cohort_store(DATA_PATH).get().X,
+                               model_name=MODEL_NAME,
+                               encoder_name=ENCODER_NAME)
+
+
+@st.experimental_singleton
+def load_strategy_cube(path, cube_fingerprint):
+    """Strategy cube shared by all the sessions, reloaded when it changes"""
+    return StrategyCube.load(path)
+
+
+def get_strategy_cube(model_version):
+    """Precomputed strategy cube of the dataset, None if missing or stale"""
+    if not os.path.exists(CUBE_PATH):
+        return None
+    cube = load_strategy_cube(CUBE_PATH, file_fingerprint(CUBE_PATH))
+    if not cube.is_current(get_source_fingerprint(DATA_PATH), model_version):
+        return None
+    return cube
+
+
+def evaluate_strategy(result_cache, key, strategy_config, model_version):
+    """
+    Results of the strategy `key`, whose lookup in `result_cache` was already
+    counted, computed unless another session cached them meanwhile
+    """
+    value = result_cache.peek(key)
+    if value is None:
+        value = run_improvement_strategy(strategy_config, model_version)
+        result_cache.put(key, value)
+        logger.info("strategy result cache miss: %s", result_cache.stats())
+    return value
+
+
+def run_improvement_strategy(strategy_config, model_version):
+    """
+    Load student data and run the improvement strategy, on a worker thread,
+    returns the results and the stage timings records of the evaluation
+    """
+    records = start_run()
+    # the cohort is loaded once per process and shared read-only by all
+    # the sessions and strategy results
+    with span("data.load") as load_span:
+        cohort = get_shared_cohort_store(DATA_PATH).get()
+        load_span.set_rows(len(cohort))
+    X, y = cohort.X, cohort.y
+    # only the students new or changed since the previous run are rescored
+    estimator = IncrementalImprovementStrategy(
+        X,
+        y,
+        strategy_config=strategy_config,
+        inference_model=get_scoring_client() if SCORING_SERVICE_ADDRESS else
+        get_baseline_model(model_version),
+        model_version=model_version,
+        dataset=DATA_PATH)
+    estimator.apply_improvement_strategy()
+    # compact result sharing the student features and names read-only
+    result = StrategyResult.from_strategy(
+        estimator, extra=cohort.names)
+    # dataframe used for data export and its range index shared by the tabs
+    display_frame = result.frame([
+        "FirstName", "FamilyName", "PerformanceGain", "Complexity",
+        "FinalGrade", "ExpectedGrade"
+    ], reset_index=True)
+    range_index = MeasureRangeIndex(
+        display_frame,
+        ["PerformanceGain", "Complexity", "ExpectedGrade", "FinalGrade"])
+    priority_index = PrioritizationIndex(display_frame)
+    return result, display_frame, range_index, priority_index, records
+
 
 # Setup sidebar
 with st.sidebar:
@@ -44,26 +179,42 @@ with st.sidebar:
                         options=conf["options"],
                         value=conf["default"])
 
-# load student data
-df_data = pd.read_csv("data/student_data.csv", index_col="StudentID")
-X, y = df_data.drop(["FinalGrade", "FirstName", "FamilyName"],
-                    axis=1), df_data["FinalGrade"]
-
-# Setup and run default improvement strategy
+# Setup and run the improvement strategy, reusing the results of previous
+# reruns with the same dataset, model and strategy configuration. Uncached
+# strategies are evaluated in the background once the settings stop changing
+# and the last completed results are shown meanwhile.
 strategy_config = {
     feature: data["value"]
     for feature, data in actionable_features.items()
 }
-estimator = DefaultImprovementStrategy(X, y, strategy_config=strategy_config)
-estimator.apply_improvement_strategy()
-# reintegrate student features
-estimator.X_target[["FirstName", "FamilyName", "FinalGrade"
-                    ]] = df_data[["FirstName", "FamilyName", "FinalGrade"]]
-# dataframe used for data export
-display_frame = estimator.X_target[[
-    "FirstName", "FamilyName", "PerformanceGain", "Complexity", "FinalGrade",
-    "ExpectedGrade"
-]].reset_index().copy()
+result_cache = get_strategy_result_cache()
+# both artifacts versions, a new encoder invalidating the results as well
+model_version = artifacts_version([MODEL_NAME, ENCODER_NAME])
+requested_key = make_cache_key(file_fingerprint(DATA_PATH), model_version,
+                               strategy_config)
+# instant cohort-level preview while the per-student results are computed
+with st.sidebar:
+    st.header("Cohort-level preview:")
+    strategy_cube_component(get_strategy_cube(model_version), strategy_config)
+strategy_runner = get_strategy_runner()
+cached_result = result_cache.get(requested_key)
+if cached_result is not None:
+    strategy_runner.resolve(requested_key, cached_result)
+else:
+    strategy_runner.submit(
+        requested_key,
+        lambda: evaluate_strategy(result_cache, requested_key,
+                                  strategy_config, model_version))
+status = st.empty()
+if strategy_runner.completed is None:
+    with st.spinner("Evaluating the strategy..."):
+        strategy_runner.wait()
+cache_key, (result, display_frame, range_index, priority_index,
+            strategy_records) = strategy_runner.completed
+if strategy_runner.pending:
+    status.info("Recomputing with the new strategy settings, the previous "
+                "results are shown meanwhile...")
+y = result.y
 
 st.markdown("""
     # About the dashboard:
@@ -86,69 +237,104 @@ st.markdown("""
 
 # Dashboard body section
 st.markdown("""# Students prioritization dashboard:""")
-tab1, tab2, tab3 = st.tabs([
+tab1, tab2, tab3, tab4 = st.tabs([
     "Complexity vs Performance gain", "Complexity  vs Expected grades",
-    "Complexity vs Actual grades"
+    "Complexity vs Actual grades", "Prioritized students"
 ])
 
 st_displayer = st.pyplot if option == "static" else st.plotly_chart
 with tab1:
-    st_displayer(
-        scatter_plot(estimator.X_target["PerformanceGain"],
-                     estimator.X_target["Complexity"],
-                     option,
-                     xlabel="Performance gain",
-                     color="orange",
-                     **plot_params))
-    st_displayer(priority_scatter_plot(estimator, y, option, **plot_params))
+    with span("figures.performance_gain", rows=len(y)):
+        st_displayer(
+            scatter_plot(result["PerformanceGain"],
+                         result["Complexity"],
+                         option,
+                         xlabel="Performance gain",
+                         color="orange",
+                         **plot_params))
+        st_displayer(
+            priority_scatter_plot(result, y, option, **plot_params))
 
     st.header("Filter/Export students of interest:")
     filter_and_export_component(
-        estimator,
+        result,
         display_frame,
         filter_features=["PerformanceGain", "Complexity"],
         ascending=False,
-        start_int_key=1)
+        start_int_key=1,
+        range_index=range_index,
+        export_cache=get_export_cache(),
+        cache_key=cache_key)
 
 with tab2:
-    st_displayer(
-        scatter_plot(estimator.X_target["ExpectedGrade"],
-                     estimator.X_target["Complexity"],
-                     option,
-                     color="green",
-                     alpha=0.7,
-                     **plot_params))
+    with span("figures.expected_grade", rows=len(y)):
+        st_displayer(
+            scatter_plot(result["ExpectedGrade"],
+                         result["Complexity"],
+                         option,
+                         color="green",
+                         alpha=0.7,
+                         **plot_params))
     st.header("Filter/Export students of interest:")
     filter_and_export_component(
-        estimator,
+        result,
         display_frame,
         filter_features=["Complexity", "ExpectedGrade"],
         ascending=True,
-        start_int_key=4)
+        start_int_key=4,
+        range_index=range_index,
+        export_cache=get_export_cache(),
+        cache_key=cache_key)
 with tab3:
-    st_displayer(
-        scatter_plot(y,
-                     estimator.X_target["Complexity"],
-                     option,
-                     color="red",
-                     alpha=0.7,
-                     **plot_params))
+    with span("figures.final_grade", rows=len(y)):
+        st_displayer(
+            scatter_plot(y,
+                         result["Complexity"],
+                         option,
+                         color="red",
+                         alpha=0.7,
+                         **plot_params))
     st.header("Filter/Export students of interest:")
-    filter_and_export_component(estimator,
+    filter_and_export_component(result,
                                 display_frame,
                                 filter_features=["Complexity", "FinalGrade"],
                                 ascending=True,
-                                start_int_key=7)
+                                start_int_key=7,
+                                range_index=range_index,
+                                export_cache=get_export_cache(),
+                                cache_key=cache_key)
+with tab4:
+    st.header("Students to prioritize:")
+    prioritization_component(priority_index,
+                             start_int_key=10,
+                             export_cache=get_export_cache(),
+                             cache_key=cache_key)
 
 # Download the target data created from the ongoing strategy
 with st.sidebar:
     st.header("3) Export strategy performance measures:")
-    st.download_button(
-        label="Download output measures data as CSV",
-        data=estimator.X_target[[
-            "FirstName", "FamilyName", "Complexity", "FinalGrade",
-            "ExpectedGrade", "PerformanceGain"
-        ]].to_csv().encode('utf-8'),
-        file_name='strategy_output_data.csv',
-        mime='text/csv',
-    )
+    export_component(lambda: result[[
+        "FirstName", "FamilyName", "Complexity", "FinalGrade",
+        "ExpectedGrade", "PerformanceGain"
+    ]],
+                     "strategy_output_data",
+                     label="Download output measures data",
+                     key="strategy-output",
+                     export_cache=get_export_cache(),
+                     cache_key=cache_key)
+
+# Rerun once the latest strategy settings are evaluated, each indicator
+# update letting streamlit interrupt the wait on new settings
+if strategy_runner.pending:
+    while strategy_runner.pending:
+        strategy_runner.wait(timeout=0.2)
+        status.info("Recomputing with the new strategy settings, the "
+                    "previous results are shown meanwhile...")
+    st.experimental_rerun()
+
+# Stage timings of the displayed strategy evaluation and of this rerun, when
+# the instrumentation is enabled
+if timing_enabled():
+    with st.sidebar.expander("Stage timings"):
+        st.dataframe(pd.DataFrame(strategy_records + get_run_records()))
+        st.caption(f"Strategy result cache: {result_cache.stats()}")